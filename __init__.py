@@ -34,6 +34,10 @@ Wn_grid_parser.dtd            = os.path.join(cwd,
                                 'resources',
                                 'odwn',
                                 'odwn-orbn-lmf.dtd')
+Wn_grid_parser.xsd            = os.path.join(cwd,
+                                'resources',
+                                'odwn',
+                                'odwn-orbn-lmf.xsd')
 Wn_grid_parser.README         = open(os.path.join(cwd,"README.md")).read()
 Wn_grid_parser.LICENSE        = open(os.path.join(cwd,"LICENSE.md")).read()
 Wn_grid_parser.__author__     = "Marten Postma"
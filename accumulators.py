@@ -0,0 +1,483 @@
+from collections import defaultdict
+
+from relation import Relation
+
+class LeRecord():
+    '''
+    values of a LexicalEntry element that are read once for all accumulators
+    (and for all index methods, see Wn_grid_parser.index_lexicon)
+
+    @type  le_el: lxml.etree._Element
+    @param le_el: LexicalEntry element
+    '''
+    __slots__ = ['le_el','le_id','pos','sense_el','sense_id','lemma',
+                 'synset','provenance','annotator']
+
+    def __init__(self,le_el):
+        self.le_el      = le_el
+        self.le_id      = le_el.get("id")
+        self.pos        = le_el.get("partOfSpeech")
+        self.sense_el   = le_el.find("Sense")
+        lemma_el        = le_el.find("Lemma")
+        self.lemma      = lemma_el.get("writtenForm") if lemma_el is not None else None
+        self.sense_id   = self.sense_el.get("id")
+        self.synset     = self.sense_el.get("synset")
+        self.provenance = self.sense_el.get("provenance")
+        self.annotator  = self.sense_el.get("annotator")
+
+
+class SynsetRecord():
+    '''
+    values of a Synset element that are read once for all accumulators
+    (and for all index methods, see Wn_grid_parser.index_lexicon)
+
+    @type  synset_el: lxml.etree._Element
+    @param synset_el: Synset element
+    '''
+    __slots__ = ['synset_el','sy_id','relations','reltypes']
+
+    def __init__(self,synset_el):
+        self.synset_el = synset_el
+        self.sy_id     = synset_el.get("id")
+
+        #list of (SynsetRelation element,reltype,target)
+        self.relations = [(relation_el,
+                           relation_el.get("relType"),
+                           relation_el.get("target"))
+                          for relation_el in synset_el.iterfind("SynsetRelations/SynsetRelation")]
+        self.reltypes  = {reltype for relation_el,reltype,target in self.relations}
+
+
+class Accumulator():
+    '''
+    base class of a statistic computed by Stats.stats_run.
+
+    the LexicalEntry and Synset children of the Lexicon element are
+    visited once for all accumulators together (multi-words are ignored,
+    as in les_get_generator). only the visit methods of the tags
+    in class attribute tags are called. the result of an accumulator
+    may only depend on the elements with these tags, Stats.stats_compute
+    caches it until one of them is modified.
+
+    @type  parser: Wn_grid_parser
+    @param parser: parser of which the stats are computed
+    '''
+    name = None
+    tags = []
+
+    def __init__(self,parser):
+        self.parser = parser
+
+    def visit_le(self,le):
+        '''
+        visit LexicalEntry element
+
+        @type  le: LeRecord
+        @param le: values of LexicalEntry element
+        '''
+        pass
+
+    def visit_synset(self,synset):
+        '''
+        visit Synset element
+
+        @type  synset: SynsetRecord
+        @param synset: values of Synset element
+        '''
+        pass
+
+    def result(self):
+        '''
+        return the statistic (called after all elements were visited)
+        '''
+        return None
+
+
+class NumLes(Accumulator):
+    '''
+    number of lexical entries (see Stats.stats_num_les)
+    '''
+    name = 'num_lexical_entries'
+    tags = ['LexicalEntry']
+
+    def __init__(self,parser):
+        Accumulator.__init__(self,parser)
+        self.num_les = 0
+
+    def visit_le(self,le):
+        self.num_les += 1
+
+    def result(self):
+        return self.num_les
+
+
+class EmptyLemmas(Accumulator):
+    '''
+    number of lexical entries with an empty lemma (see Stats.empty_lemmas)
+    '''
+    name = 'empty_lemmas'
+    tags = ['LexicalEntry']
+
+    def __init__(self,parser):
+        Accumulator.__init__(self,parser)
+        self.empty_lemmas = 0
+
+    def visit_le(self,le):
+        if not le.lemma:
+            self.empty_lemmas += 1
+
+    def result(self):
+        return self.empty_lemmas
+
+
+class Provenance(Accumulator):
+    '''
+    provenance counts (see Stats.resources_check)
+    '''
+    name = 'provenance'
+    tags = ['LexicalEntry']
+
+    def __init__(self,parser):
+        Accumulator.__init__(self,parser)
+        self.resources_dict = defaultdict(int)
+
+    def visit_le(self,le):
+        resource_tag = le.provenance
+
+        if resource_tag is None:
+            self.resources_dict['None'] += 1
+        else:
+            for resource in resource_tag.split("+"):
+                self.resources_dict[resource] += 1
+
+    def result(self):
+        return [(key,value) for key,value in sorted(self.resources_dict.items())]
+
+
+class Polysemy(Accumulator):
+    '''
+    average polysemy and polysemy dict (see Stats.polysemy_dict)
+    '''
+    name = 'polysemy'
+    tags = ['LexicalEntry']
+
+    def __init__(self,parser):
+        Accumulator.__init__(self,parser)
+        self.lemmas = defaultdict(int)
+
+    def visit_le(self,le):
+        self.lemmas[le.lemma] += 1
+
+    def result(self):
+        polysemy_dict = defaultdict(list)
+
+        for lemma,polysemy in self.lemmas.items():
+            polysemy_dict[polysemy].append(lemma)
+
+        total    = 0.0
+        instance = 0.0
+        for polysemy,list_lemmas in polysemy_dict.items():
+            total    += (polysemy * len(list_lemmas))
+            instance += len(list_lemmas)
+        average_polysemy = round(total/instance,1)
+
+        return average_polysemy,polysemy_dict
+
+
+class EmptySynsets(Accumulator):
+    '''
+    synsets without synonyms (see Stats.stats_empty_synsets).
+    the result also contains 'empty_pwn_synsets' and 'leave_pwn_synsets'.
+    '''
+    name = 'empty_synsets'
+    tags = ['LexicalEntry','Synset']
+
+    def __init__(self,parser):
+        Accumulator.__init__(self,parser)
+        self.non_empty_synsets = set()
+        self.leaves            = []
+
+    def visit_le(self,le):
+        self.non_empty_synsets.add(le.synset)
+
+    def visit_synset(self,synset):
+        if 'has_hyponym' not in synset.reltypes:
+            self.leaves.append(synset.sy_id)
+
+    def result(self):
+        empty_synsets = set(self.parser.syn_ids.keys()) - self.non_empty_synsets
+
+        empty_odwn_synsets = {sy_id for sy_id in empty_synsets if sy_id.startswith("odwn")}
+        empty_pwn_synsets  = sorted(sy_id for sy_id in empty_synsets if sy_id.startswith("eng"))
+
+        leave_empty_odwn_synsets = {sy_id for sy_id in self.leaves
+                                    if sy_id in empty_odwn_synsets}
+        leave_pwn_synsets        = {sy_id for sy_id in self.leaves
+                                    if sy_id.startswith('eng-30')}
+
+        return  { 'num_empty_synsets'        : len(empty_synsets),
+                  'num_empty_odwn_synsets'   : len(empty_odwn_synsets),
+                  'num_empty_pwn_synsets'    : len(empty_pwn_synsets),
+                  'leave_empty_odwn_synsets' : leave_empty_odwn_synsets,
+                  'empty_pwn_synsets'        : empty_pwn_synsets,
+                  'leave_pwn_synsets'        : leave_pwn_synsets}
+
+
+class LargeSynsets(Accumulator):
+    '''
+    synsets with 5 till 10 (not included) synonyms of which at least
+    one was not annotated (see Stats.stats_large_synsets)
+    '''
+    name    = 'large_synsets'
+    tags    = ['LexicalEntry']
+    minimum = 5
+    maximum = 10
+
+    def __init__(self,parser):
+        Accumulator.__init__(self,parser)
+        self.freq = {}
+
+    def visit_le(self,le):
+        target    = le.synset
+        annotated = le.annotator != ''
+        if target in self.freq:
+            self.freq[target]['polysemy'] += 1
+            if not annotated:
+                self.freq[target]['annotated'] = annotated
+        else:
+            self.freq[target] = {'polysemy' : 1,
+                                 'annotated': annotated}
+
+    def result(self):
+        min_max = range(self.minimum,self.maximum)
+        return [key for key,value in self.freq.items()
+                if all([value['polysemy'] in min_max,
+                        not value['annotated']])]
+
+
+class Rels(Accumulator):
+    '''
+    number of synset relations and impossible relations by failure reason
+    (see Stats.stats_rels and Stats.stats_relation_integrity).
+    the checks of Synsets.validate_relation are done in the same order
+    with the hashed ivars syn_ids and reltypes of the parser.
+    relations that occur more than once in a synset are duplicates.
+    '''
+    name               = 'rels'
+    tags               = ['Synset']
+    reasons            = ['target_missing',
+                          'source_missing',
+                          'cross_pos',
+                          'source_is_target',
+                          'unknown_reltype',
+                          'duplicate']
+    cross_pos_reltypes = frozenset(['has_hyperonym','has_hyponym'])
+
+    def __init__(self,parser):
+        Accumulator.__init__(self,parser)
+        self.syn_ids    = parser.syn_ids
+        self.reltypes   = parser.reltypes
+        self.num_rels   = 0
+        self.impossible = []
+        self.by_reason  = {reason: [] for reason in self.reasons}
+
+    def visit_synset(self,synset):
+        source        = synset.sy_id
+        source_exists = source in self.syn_ids
+        source_pos    = source[-1] if source else None
+        existing      = set()
+
+        self.num_rels += len(synset.relations)
+
+        for relation_el,reltype,target in synset.relations:
+            if target not in self.syn_ids:
+                reason = 'target_missing'
+            elif not source_exists:
+                reason = 'source_missing'
+            elif target[-1] != source_pos and reltype in self.cross_pos_reltypes:
+                reason = 'cross_pos'
+            elif source == target:
+                reason = 'source_is_target'
+            elif reltype not in self.reltypes:
+                reason = 'unknown_reltype'
+            elif (reltype,target) in existing:
+                reason = 'duplicate'
+            else:
+                existing.add((reltype,target))
+                continue
+
+            rel_obj = Relation(relation_el,self.parser)
+            self.impossible.append(rel_obj)
+            self.by_reason[reason].append(rel_obj)
+
+    def result(self):
+        return {'num_rels'   : self.num_rels,
+                'impossible' : self.impossible,
+                'by_reason'  : self.by_reason}
+
+
+class Tops(Accumulator):
+    '''
+    synsets without hypernym relation (see Stats.tops)
+    '''
+    name = 'tops'
+    tags = ['Synset']
+
+    def __init__(self,parser):
+        Accumulator.__init__(self,parser)
+        self.tops = []
+
+    def visit_synset(self,synset):
+        if 'has_hyperonym' not in synset.reltypes:
+            self.tops.append(synset.sy_id)
+
+    def result(self):
+        return self.tops
+
+
+class NoGloss(Accumulator):
+    '''
+    number of synsets without gloss, empty glosses and
+    one word glosses (see Stats.no_gloss)
+    '''
+    name      = 'sy_no_gloss,empty_glosses,one_word'
+    tags      = ['Synset']
+    languages = ['en','nl']
+
+    def __init__(self,parser):
+        Accumulator.__init__(self,parser)
+        self.sy_no_gloss   = 0
+        self.empty_glosses = 0
+        self.one_word      = 0
+
+    def visit_synset(self,synset):
+        defs_el = synset.synset_el.find("Definitions")
+        glosses = [def_el.get('gloss')
+                   for def_el in defs_el.iterchildren("Definition")
+                   if def_el.get('language') in self.languages] if defs_el is not None else []
+
+        if not glosses:
+            self.sy_no_gloss += 1
+
+        for gloss in glosses:
+            if not gloss:
+                self.empty_glosses += 1
+
+            if len(gloss.split()) == 1:
+                self.one_word += 1
+
+    def result(self):
+        return self.sy_no_gloss,self.empty_glosses,self.one_word
+
+
+class PosCounts(Accumulator):
+    '''
+    number of synsets per pos (see Stats.count_pos)
+    '''
+    name = 'pos_counts'
+    tags = ['Synset']
+
+    def __init__(self,parser):
+        Accumulator.__init__(self,parser)
+        self.pos = defaultdict(int)
+
+    def visit_synset(self,synset):
+        self.pos[synset.sy_id[-1]] += 1
+
+    def result(self):
+        return [(key,value) for key,value in sorted(self.pos.items())]
+
+
+class BidirectionalRelations(Accumulator):
+    '''
+    relations to add for two relation types that imply each other
+    (see Stats.missing_bidirectional_relations)
+
+    @type  rel1: str
+    @param rel1: relation, for example 'has_hyponym'
+
+    @type  rel2: str
+    @param rel2: relation, for example 'has_hyperonym'
+    '''
+    name = 'bidirectional_relations'
+    tags = ['Synset']
+
+    def __init__(self,parser,rel1="has_hyponym",rel2="has_hyperonym"):
+        Accumulator.__init__(self,parser)
+        self.rel1 = rel1
+        self.rel2 = rel2
+        self.rels = {}
+
+    def visit_synset(self,synset):
+        if self.rel1 not in synset.reltypes and self.rel2 not in synset.reltypes:
+            return
+
+        sy_id = synset.sy_id
+        for relation_el,reltype,target in synset.relations:
+            if reltype == self.rel1 or reltype == self.rel2:
+                key = (sy_id,target) if sy_id < target else (target,sy_id)
+                if key not in self.rels:
+                    #first relation and reltypes of the synset pair
+                    self.rels[key] = ((sy_id,target,reltype),set())
+                self.rels[key][1].add(reltype)
+
+    def result(self):
+        rels_to_add = []
+        goal        = set([self.rel1,self.rel2])
+        for (source,target,reltype),reltypes in self.rels.values():
+            if reltypes != goal:
+
+                miss_reltypes = goal.difference(reltypes)
+                for rel_to_add in miss_reltypes:
+                    rels_to_add.append((target,source,rel_to_add))
+
+        return rels_to_add
+
+
+class NoRels(Accumulator):
+    '''
+    synsets without hyponym and hypernym relations (see Stats.sy_no_rels)
+    '''
+    name = 'no_rels'
+    tags = ['Synset']
+
+    def __init__(self,parser):
+        Accumulator.__init__(self,parser)
+        self.no_rels = set()
+
+    def visit_synset(self,synset):
+        if 'has_hyponym' not in synset.reltypes and \
+           'has_hyperonym' not in synset.reltypes:
+            self.no_rels.add(synset.sy_id)
+
+    def result(self):
+        return self.no_rels
+
+
+class Contradicting(Accumulator):
+    '''
+    different reltypes linking the same source and target
+    (see Stats.contradicting_rels)
+    '''
+    name = 'contradicting'
+    tags = ['Synset']
+
+    def __init__(self,parser):
+        Accumulator.__init__(self,parser)
+        self.contradicting = defaultdict(list)
+
+    def visit_synset(self,synset):
+        if len(synset.relations) < 2:
+            return
+
+        #(source,target) pairs only occur within one synset
+        targets = defaultdict(list)
+        for relation_el,reltype,target in synset.relations:
+            targets[target].append(reltype)
+
+        for target,reltypes in targets.items():
+            if len(reltypes) > 1:
+                self.contradicting[(synset.sy_id,target)] = reltypes
+
+    def result(self):
+        return self.contradicting
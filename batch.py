@@ -0,0 +1,387 @@
+from contextlib import contextmanager
+from le import Le
+from synset import Synset
+from relation import Relation
+
+class Batch():
+    '''
+    queue edits of the lexicon and apply them together.
+
+    inside a batch (see batch), the following edits are queued instead of
+    applied:
+    (1) adding a LexicalEntry (les_add_le) or a Synset (synsets_add_synset)
+    (2) removing a LexicalEntry, Synset or SynsetRelation (remove_me)
+    (3) changing the provenance or annotator of a lexical entry
+    (les_set_provenance, les_set_annotator)
+    (4) adding relations to an existing synset (Synset.add_relations)
+
+    lookups inside a batch see the document as it was before the batch.
+
+    ivar batch_ops is None outside a batch, else it holds the queued edits:
+        'add'           -> new LexicalEntry and Synset elements
+        'remove'        -> elements to remove
+        (both are dicts with the elements as keys, in the order they were queued)
+        'set'           -> list of (LexicalEntry element,attribute,value)
+        'relations'     -> dict with (Synset element,reltype,target) as keys,
+                           in the order they were queued
+        'orbn_ids'      -> sense ids reserved by the queued lexical entries
+        'sense_numbers' -> mapping (lemma,pos) -> highest queued sense number
+        'synsets'       -> synset identifiers after the batch
+                           (None if not computed, see batch_synsets)
+    '''
+    def __init__(self):
+        pass
+
+    @contextmanager
+    def batch(self):
+        '''
+        context in which edits are queued. when the context exits, the
+        queued edits are validated together and applied at once
+        (see batch_commit).
+        if validation fails or an exception is raised inside the context,
+        nothing is applied.
+        a batch inside a batch is part of the outer batch.
+
+        >>> from lxml import etree
+        >>> from wn_grid_parser import Wn_grid_parser
+        >>> path = "resources/test/odwn_test.xml.gz"
+        >>> instance,sequential = Wn_grid_parser(path),Wn_grid_parser(path)
+        >>> def edits(parser):
+        ...     parser.les_remove_le('boom-n-2')
+        ...     parser.les_add_le('nieuw','noun','n','eng-30-00000101-n',['google'],
+        ...                       sense_id='o_n-000000001')
+        ...     return parser.synsets_add_relations([('eng-30-00000102-n','eng-30-00000101-n','has_hyperonym'),
+        ...                                          ('eng-30-00000107-n','eng-30-00000101-n','has_hyperonym')])
+
+        a batch gives the same result as the same edits without a batch
+        >>> with instance.batch():
+        ...     results = edits(instance)
+        >>> results
+        [(True, 'queued'), (False, 'relation already exists')]
+        >>> edits(sequential)
+        [(True, ''), (False, 'relation already exists')]
+        >>> etree.tostring(instance.doc) == etree.tostring(sequential.doc)
+        True
+        >>> all([set(getattr(instance,attr)) == set(getattr(sequential,attr))
+        ...      for attr in ['le_els','synset_els','orbn_ids']])
+        True
+        >>> instance.counts == sequential.counts
+        True
+
+        a batch with an invalid edit is rolled back
+        >>> before  = etree.tostring(instance.doc)
+        >>> indexes = [dict(getattr(instance,attr))
+        ...            for attr in ['le_els','synset_els','orbn_ids','counts']]
+        >>> try:
+        ...     with instance.batch():
+        ...         added   = instance.les_add_le('ander','noun','n','eng-30-00000102-n',['google'])
+        ...         removed = instance.les_remove_le('auto-n-3')
+        ...         results = instance.synsets_add_relations([('eng-30-00000104-n','eng-30-00000105-n','has_hyperonym')])
+        ...         removed = instance.synsets_find_synset('eng-30-00000105-n').remove_me()
+        ... except ValueError as error:
+        ...     print(error)
+        batch rolled back, 1 invalid edit(s):
+        eng-30-00000104-n has_hyperonym eng-30-00000105-n: target: eng-30-00000105-n not in existing synsets
+        >>> etree.tostring(instance.doc) == before
+        True
+        >>> [dict(getattr(instance,attr))
+        ...  for attr in ['le_els','synset_els','orbn_ids','counts']] == indexes
+        True
+        >>> instance.batch_ops is None
+        True
+        '''
+        self.stream_require_tree('batch')
+        if self.batch_active():
+            yield self
+            return
+
+        self.batch_ops = {'add'           : {},
+                          'remove'        : {},
+                          'set'           : [],
+                          'relations'     : {},
+                          'orbn_ids'      : [],
+                          'sense_numbers' : {},
+                          'synsets'       : None}
+        try:
+            yield self
+        except BaseException:
+            self.batch_rollback()
+            raise
+
+        self.batch_commit()
+
+    def batch_active(self):
+        '''
+        return whether edits are queued
+
+        @rtype: bool
+        @return: True if inside a batch, else False
+        '''
+        return getattr(self,'batch_ops',None) is not None
+
+    def batch_add(self,element):
+        '''
+        queue adding a new child of ivar lexicon_el. new lexical entries
+        are inserted at the start of the lexicon (as in les_add_le),
+        new synsets are appended.
+
+        @type  element: lxml.etree._Element
+        @param element: LexicalEntry or Synset element
+        '''
+        self.batch_ops['add'][element] = None
+
+        if element.tag == 'Synset':
+            self.batch_ops['synsets'] = None
+
+        if element.tag == 'LexicalEntry':
+            sense_el = element.find("Sense")
+            self.batch_ops['orbn_ids'].append(sense_el.get("id"))
+            self.orbn_ids[sense_el.get("id")] = ""
+
+            key = (element.find("Lemma").get("writtenForm"),element.get("partOfSpeech"))
+            self.batch_ops['sense_numbers'][key] = max(int(sense_el.get("senseId")),
+                                                       self.batch_ops['sense_numbers'].get(key,0))
+
+    def batch_remove(self,element):
+        '''
+        queue removing an element. removing an element that was added
+        in the same batch cancels the addition.
+
+        @type  element: lxml.etree._Element
+        @param element: LexicalEntry, Synset or SynsetRelation element
+
+        @rtype: tuple
+        @return: (succes,message)
+        '''
+        if element in self.batch_ops['add']:
+            del self.batch_ops['add'][element]
+        else:
+            self.batch_ops['remove'][element] = None
+
+        if element.tag == 'Synset':
+            self.batch_ops['synsets'] = None
+        return (True,'queued')
+
+    def batch_set(self,le_el,attribute,value):
+        '''
+        queue setting an attribute of the Sense element of a lexical entry
+
+        @type  le_el: lxml.etree._Element
+        @param le_el: LexicalEntry element
+
+        @type  attribute: str
+        @param attribute: provenance | annotator
+
+        @type  value: str
+        @param value: new value of the attribute
+        '''
+        self.batch_ops['set'].append((le_el,attribute,value))
+
+    def batch_synsets(self):
+        '''
+        return synset identifiers that exist after the batch
+        (the queued synsets are added, the queued synsets removed)
+
+        @rtype: dict | set
+        @return: synset identifiers (ivar syn_ids if no synsets are queued)
+        '''
+        ops = self.batch_ops
+        if ops['synsets'] is None:
+            removed_ids = {element.get('id') for element in ops['remove']
+                           if element.tag == 'Synset'}
+            added_ids   = {element.get('id') for element in ops['add']
+                           if element.tag == 'Synset'}
+
+            ops['synsets'] = self.syn_ids
+            if any([removed_ids,added_ids]):
+                ops['synsets'] = (set(self.syn_ids) - removed_ids) | added_ids
+
+        return ops['synsets']
+
+    def batch_add_relations(self,synset_el,rels):
+        '''
+        validate relations against the synsets after the batch
+        (see validate_relation) and queue the valid ones
+        for an existing synset
+
+        @type  synset_el: lxml.etree._Element
+        @param synset_el: Synset element
+
+        @type  rels: list
+        @param rels: list of tuples (reltype,target)
+
+        @rtype: list
+        @return: list of tuples (succes,message), one per relation
+        '''
+        ops     = self.batch_ops
+        source  = synset_el.get('id')
+        synsets = self.batch_synsets()
+        results = []
+
+        existing_rels = {(relation_el.get("relType"),relation_el.get("target"))
+                         for relation_el in synset_el.iterfind("SynsetRelations/SynsetRelation")
+                         if relation_el not in ops['remove']}
+
+        for reltype,target in rels:
+            if synset_el in ops['remove']:
+                results.append((False,'source: %s is removed in batch' % source))
+                continue
+
+            succes,message = self.validate_relation(source,reltype,target,
+                                                    synsets=synsets)
+            if not succes:
+                results.append((succes,message))
+                continue
+
+            if any([(reltype,target) in existing_rels,
+                    (synset_el,reltype,target) in ops['relations']]):
+                results.append((False,"relation already exists"))
+                continue
+
+            ops['relations'][(synset_el,reltype,target)] = None
+            results.append((True,'queued'))
+
+        return results
+
+    def batch_highest_sense_number(self,lemma,pos):
+        '''
+        return highest sense number of the lexical entries of a lemma
+        that are queued in the current batch
+
+        @type  lemma: str
+        @param lemma: lemma
+
+        @type  pos: str
+        @param pos: noun | verb
+
+        @rtype: int
+        @return: highest queued sense number (0 if none or outside a batch)
+        '''
+        if not self.batch_active():
+            return 0
+        return self.batch_ops['sense_numbers'].get((lemma,pos),0)
+
+    def batch_validate(self):
+        '''
+        validate the queued edits together:
+        (1) removed elements have to be in the document
+        (2) identifiers of added elements have to be unique
+        after the batch
+        (3) added relations have to be valid after the batch
+        (see validate_relation)
+
+        @rtype: list
+        @return: list of error messages (empty if valid)
+        '''
+        ops     = self.batch_ops
+        removed = ops['remove']
+        errors  = []
+
+        #(1) removed elements have to be in the document
+        for element in ops['remove']:
+            if element.getparent() is None:
+                errors.append('%s not in document: %s' % (element.tag,
+                                                          element.get('id',element.get('target'))))
+
+        #(2) identifiers of added elements have to be unique after the batch
+        existing = {'LexicalEntry' : self.le_els,
+                    'Synset'       : self.synset_els}
+        added    = set()
+        for element in ops['add']:
+            key    = (element.tag,element.get('id'))
+            old_el = existing[element.tag].get(key[1])
+
+            if any([key in added,
+                    old_el is not None and old_el not in removed]):
+                errors.append('%s exists already: %s' % key)
+            added.add(key)
+
+        #(3) added relations have to be valid after the batch
+        #(they were valid when they were queued)
+        synsets = self.batch_synsets()
+
+        for synset_el,reltype,target in ops['relations']:
+            source = synset_el.get('id')
+            if synset_el in removed:
+                errors.append('source: %s is removed in batch' % source)
+                continue
+
+            succes,message = self.validate_relation(source,reltype,target,
+                                                    synsets=synsets)
+            if not succes:
+                errors.append('%s %s %s: %s' % (source,reltype,target,message))
+
+        return errors
+
+    def batch_commit(self):
+        '''
+        validate and apply the queued edits (the batch is rolled back
+        if validation fails):
+        (1) removed children of ivar lexicon_el are unindexed
+        (2) removed children are unlinked from ivar lexicon_el, new lexical
+        entries are inserted at the start (the last added first, as in
+        les_add_le) and new synsets are appended
+        (3) added children are indexed
+        (4) removed relations are removed
+        (5) queued relations are added (grouped by synset)
+        (6) queued attributes are set
+
+        @raise ValueError: if the queued edits are not valid
+        '''
+        errors = self.batch_validate()
+        if errors:
+            self.batch_rollback()
+            raise ValueError('batch rolled back, %s invalid edit(s):\n%s' % (len(errors),
+                                                                            '\n'.join(errors)))
+
+        ops = self.batch_ops
+        self.batch_ops = None
+
+        #(1) removed children are unindexed
+        removed_children = [element for element in ops['remove']
+                            if element.getparent() is self.lexicon_el]
+        for element in removed_children:
+            self.unindex_element(element)
+
+        #(2) update children of lexicon. lxml unlinks an element without
+        #searching the children, rebuilding all children is slower
+        for element in removed_children:
+            self.lexicon_el.remove(element)
+
+        for element in ops['add']:
+            if element.tag == 'LexicalEntry':
+                self.lexicon_el.insert(0,element)
+            else:
+                self.lexicon_el.append(element)
+
+        #(3) added children are indexed (in the order they were queued)
+        for element in ops['add']:
+            self.index_element(element)
+
+        #(4) removed relations
+        for element in ops['remove']:
+            if element.tag == 'SynsetRelation':
+                Relation(element,self).remove_me()
+
+        #(5) added relations (grouped by synset)
+        by_synset = {}
+        for synset_el,reltype,target in ops['relations']:
+            by_synset.setdefault(synset_el,[]).append((reltype,target))
+
+        for synset_el,rels in by_synset.items():
+            Synset(synset_el,self.reltypes,self.syn_ids,self).add_relations(rels)
+
+        #(6) attributes
+        setters = {'provenance' : self.les_set_provenance,
+                   'annotator'  : self.les_set_annotator}
+        for le_el,attribute,value in ops['set']:
+            if le_el.getparent() is self.lexicon_el:
+                setters[attribute](Le(le_el,self.lexicon_el,self),value)
+
+    def batch_rollback(self):
+        '''
+        discard the queued edits and release the reserved sense ids
+        '''
+        for sense_id in self.batch_ops['orbn_ids']:
+            self.orbn_ids.pop(sense_id,None)
+        self.batch_ops = None
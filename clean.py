@@ -13,6 +13,7 @@ class Clean():
         all relations in 
         self.stats['impossible_rels'] are removed
         '''
+        self.stream_require_tree('clean_impossible_relations')
         self.get_stats()
         for rel_el in self.stats['impossible_rels']:
             rel_el.remove_me()
@@ -25,12 +26,15 @@ class Clean():
         all proposed relations in self.stats['bidirectional_relations']
         are added
         '''
+        self.stream_require_tree('clean_bidirectional_relations')
         self.get_stats()
-        for source,target,reltype in self.stats['bidirectional_relations']:
-            sy_obj = self.synsets_find_synset(source)
-            if sy_obj is not None:
-                print('adding %s %s %s' % (source,reltype,target))
-                sy_obj.add_relation(reltype,target)
+        rels = [(source,target,reltype)
+                for source,target,reltype in self.stats['bidirectional_relations']
+                if source in self.synset_els]
+        
+        for source,target,reltype in rels:
+            print('adding %s %s %s' % (source,reltype,target))
+        self.synsets_add_relations(rels)
             
         print
         print("number of bidirectional links fixed")
@@ -42,6 +46,7 @@ class Clean():
         some LexicalEntry elements do not have a provenance tag.
         this method adds the "cdb2.2_Auto" tag as provenance
         '''
+        self.stream_require_tree('clean_provenance_to_all_les')
         default = "cdb2.2_Auto"
         added   = 0 
         for le_obj in self.les_get_generator():
@@ -50,7 +55,7 @@ class Clean():
             
             if provenance_tag is None:
                 added += 1
-                le_obj.sense_el.attrib["provenance"] = default
+                self.les_set_provenance(le_obj,default)
         
         print("number of Lexical Entries that receiced a default tag:")
         print(added)
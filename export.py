@@ -0,0 +1,314 @@
+import os
+import copy
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+class Export():
+    '''
+    export the resource to several formats at once (see export_formats):
+        'lmf' -> wn grid lmf (see Writer)
+        'omw' -> Open Multilingual Wordnet format in resources/nld
+        'ili' -> mapping between ili and odwn in resources/ili-map-odwnVERSION.ttl
+        'wn-lmf-1.0' -> WN-LMF 1.0 (see Wn_lmf)
+
+    the lmf file is written by a separate thread, the omw and ili files are
+    written during one pass over the children of the Lexicon element.
+    lxml does not support using one document in several threads at once,
+    so the thread writes a copy of ivar doc.
+    the WN-LMF 1.0 file is not part of that pass: it needs the converted
+    synsets before the first lexical entry is written, so wn_lmf_export
+    iterates the synsets and the children once more after the pass.
+    '''
+    #formats written during the pass over the children of the Lexicon element
+    export_pass_formats = ['omw','ili']
+
+    def __init__(self):
+        pass
+
+    def export_output_paths(self,output_path,formats):
+        '''
+        return output paths of the formats. omw is written to a folder
+        (default resources/nld), ili to a file (default
+        resources/ili-map-odwnVERSION.ttl), lmf and wn-lmf-1.0 to output_path.
+
+        @type  output_path: str | dict
+        @param output_path: mapping format -> output path, or one output
+        path. if both lmf and wn-lmf-1.0 are exported to one output path,
+        the WN-LMF 1.0 file is written next to it
+        (for example odwn.xml.gz -> odwn.wn-lmf-1.0.xml.gz)
+
+        @type  formats: list
+        @param formats: list of formats
+
+        @rtype: dict
+        @return: mapping format -> output path
+
+        @raise ValueError: if a format has no output path
+        '''
+        path_formats = [format for format in ['lmf','wn-lmf-1.0']
+                        if format in formats]
+
+        if isinstance(output_path,dict):
+            output_paths = {format: output_path.get(format)
+                            for format in path_formats}
+        else:
+            output_paths = {format: output_path for format in path_formats}
+
+            if len(path_formats) == 2 and output_path is not None:
+                base,compression = output_path,''
+                for extension in ['.gz','.zst']:
+                    if base.endswith(extension):
+                        base,compression = base[:-len(extension)],extension
+                if base.endswith('.xml'):
+                    base = base[:-len('.xml')]
+                output_paths['wn-lmf-1.0'] = base + '.wn-lmf-1.0.xml' + compression
+
+        for format,path in output_paths.items():
+            if path is None:
+                raise ValueError('no output path for format %s' % format)
+
+        if isinstance(output_path,dict):
+            output_paths.update({format: output_path[format]
+                                 for format in ['omw','ili']
+                                 if output_path.get(format) is not None})
+
+        if 'omw' in formats and 'omw' not in output_paths:
+            output_paths['omw'] = os.path.join(self.cwd,'resources','nld')
+
+        if 'ili' in formats and 'ili' not in output_paths:
+            version = self.__version__.replace('.','')
+            output_paths['ili'] = os.path.join(self.cwd,
+                                               'resources',
+                                               'ili-map-odwn%s.ttl' % version)
+
+        return output_paths
+
+    def export_formats(self,output_path,formats):
+        '''
+        export resource to all formats (no dtd validation of ivar doc,
+        see export). lmf, omw and ili are written in one pass over the
+        children of the Lexicon element, wn-lmf-1.0 is converted and
+        validated after that pass (see Wn_lmf).
+
+        @type  output_path: str | dict
+        @param output_path: output path of the lmf or WN-LMF 1.0 file,
+        or mapping format -> output path (see export_output_paths).
+        by default, the other formats are stored in the 'resources' folder
+
+        @type  formats: list
+        @param formats: list of formats (lmf | omw | ili | wn-lmf-1.0)
+
+        @rtype: tuple
+        @return: (succes,list of error messages). only the WN-LMF 1.0
+        file is validated, it is not written if it is not valid
+
+        >>> import gzip, os, shutil, tempfile
+        >>> from lxml import etree
+        >>> from wn_grid_parser import Wn_grid_parser
+        >>> instance = Wn_grid_parser("resources/test/odwn_test.xml.gz")
+        >>> folder = tempfile.mkdtemp()
+        >>> output_paths = {format: os.path.join(folder,name)
+        ...                 for format,name in [('lmf','odwn.xml.gz'),
+        ...                                     ('omw','nld'),
+        ...                                     ('ili','ili-map.ttl'),
+        ...                                     ('wn-lmf-1.0','odwn-wn-lmf.xml')]}
+
+        the extra WN-LMF 1.0 entries refer to synsets that are not in the
+        test file, so the WN-LMF 1.0 file is not written
+        >>> instance.export_formats(output_paths,['lmf','omw','ili','wn-lmf-1.0'])
+        (False, ['odwn-10-00000002-v: IDREF references an unknown ID "eng-30-00742320-v"'])
+        >>> sorted(os.listdir(folder))
+        ['ili-map.ttl', 'nld', 'odwn.xml.gz']
+
+        >>> parser = etree.XMLParser(remove_blank_text=True)
+        >>> with gzip.open(output_paths['lmf']) as infile:
+        ...     lmf_doc = etree.parse(infile,parser)
+        >>> etree.tostring(lmf_doc) == etree.tostring(instance.doc)
+        True
+        >>> sorted(os.listdir(output_paths['omw']))
+        ['LICENSE', 'citation.bib', 'wn-data-nld.tab']
+        >>> with open(os.path.join(output_paths['omw'],'wn-data-nld.tab')) as infile:
+        ...     omw_lines = infile.readlines()
+        >>> len(omw_lines), omw_lines[2]
+        (13, '00000101-n\\tnld:lemma\\tboom\\n')
+        >>> with open(output_paths['ili']) as infile:
+        ...     ili_lines = [line for line in infile if line.startswith('ili:')]
+        >>> len(ili_lines), ili_lines[4]
+        (9, 'ili:i6\\towl:sameAs\\todwn13:00000105-n . # deur, kast\\n')
+        >>> shutil.rmtree(folder)
+        '''
+        self.stream_require_tree('export_formats')
+        output_paths = self.export_output_paths(output_path,formats)
+        succes,errors = True,[]
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            lmf_future = None
+            if 'lmf' in formats:
+                lmf_future = executor.submit(self.export_lmf,
+                                             output_paths['lmf'],
+                                             copy.deepcopy(self.doc))
+
+            writers = {'omw' : (self.export_omw_open,self.export_omw_line),
+                       'ili' : (self.export_ili_open,self.export_ili_line)}
+            outfiles = {}
+            try:
+                for format in self.export_pass_formats:
+                    if format in formats:
+                        outfiles[format] = writers[format][0](output_paths[format])
+
+                if outfiles:
+                    self.export_pass(outfiles,{format: writers[format][1]
+                                               for format in outfiles})
+            finally:
+                for outfile in outfiles.values():
+                    outfile.close()
+
+            if 'wn-lmf-1.0' in formats:
+                succes,errors = self.wn_lmf_export(output_paths['wn-lmf-1.0'])
+
+            if lmf_future is not None:
+                lmf_future.result()
+
+        return (succes,errors)
+
+    def export_pass(self,outfiles,line_methods):
+        '''
+        write lines of the formats in one pass over the children of
+        the Lexicon element
+
+        @type  outfiles: dict
+        @param outfiles: mapping format -> file object
+
+        @type  line_methods: dict
+        @param line_methods: mapping format -> method that returns
+        the line of a child (None if there is no line)
+        '''
+        writers = [(outfiles[format].write,line_method)
+                   for format,line_method in line_methods.items()]
+
+        for child_el in self.lexicon_el.iterchildren('LexicalEntry','Synset'):
+            for write,line_method in writers:
+                line = line_method(child_el)
+                if line is not None:
+                    write(line)
+
+    def export_lmf(self,output_path,doc=None):
+        '''
+        write lmf file (see Writer)
+
+        @type  output_path: str
+        @param output_path: output path
+
+        @type  doc: lxml.etree._ElementTree
+        @param doc: [optional]. document to write (default is ivar doc)
+        '''
+        with self.writer_open(output_path) as outfile:
+            self.writer_write_lmf(outfile,doc)
+
+    def export_omw_open(self,out):
+        '''
+        (1) creates new folder (for example resources/nld)
+        (2) copies LICENSE in it
+        (3) copies reference in it
+        (4) opens wn-data-nld.tab and writes header
+
+        @type  out: str
+        @param out: path to folder (see export_output_paths)
+
+        @rtype: file object
+        @return: wn-data-nld.tab
+        '''
+        #(1) creates new folder (for example resources/nld)
+        shutil.rmtree(out,ignore_errors=True)
+        os.mkdir(out)
+
+        #(2) copies LICENSE in it
+        shutil.copy(os.path.join(self.cwd,'LICENSE.md'),os.path.join(out,'LICENSE'))
+
+        #(3) copies reference in it
+        shutil.copy(os.path.join(self.cwd,'citation.bib'),out)
+
+        #(4) opens wn-data-nld.tab
+        outfile = open(os.path.join(out,'wn-data-nld.tab'),'w')
+        header = '\t'.join([
+                            '# Open Dutch WordNet',
+                            'nld',
+                            'http://wordpress.let.vupr.nl/odwn/',
+                            'CC BY SA 4.0'])
+        outfile.write(header+'\n')
+        return outfile
+
+    def export_omw_line(self,child_el):
+        '''
+        return omw line of a lexical entry (multi-words are ignored)
+
+        @type  child_el: lxml.etree._Element
+        @param child_el: child of the Lexicon element
+
+        @rtype: str
+        @return: line (None if child is not a lexical entry of an eng synset)
+        '''
+        if any([child_el.tag != 'LexicalEntry',
+                "mwe" in child_el.get("id")]):
+            return None
+
+        synset_id = child_el.find("Sense").get("synset")
+        lemma_el  = child_el.find("Lemma")
+        lemma     = lemma_el.get("writtenForm") if lemma_el is not None else None
+        if not synset_id:
+            return None
+        prov,version,offset,pos = synset_id.split('-')
+
+        if all([prov == 'eng',
+                lemma]):
+            return '{offset}-{pos}\tnld:lemma\t{lemma}\n'.format(**locals())
+
+    def export_ili_open(self,output_path):
+        '''
+        opens output path (for example resources/ili-map-odwnVERSION.ttl)
+        and writes header
+
+        @type  output_path: str
+        @param output_path: output path (see export_output_paths)
+
+        @rtype: file object
+        @return: ili-map-odwnVERSION.ttl
+        '''
+        outfile = open(output_path,'w')
+        outfile.write('\n')
+        outfile.write('@prefix\towl:\t<http://www.w3.org/2002/07/owl#> .\n')
+        outfile.write('\n')
+        outfile.write('### Wordnets\n')
+        outfile.write('@prefix\todwn13:\t<http://odwn-rdf.vu.nl/odwn13/> .\n')
+        outfile.write('\n')
+        outfile.write('### this file\n')
+        outfile.write('\n')
+        outfile.write('@prefix ili: <http://globalwordnet.org/ili/> .\n')
+        outfile.write('@base <http://globalwordnet.org/ili/ili-map.ttl>.\n')
+        outfile.write('\n')
+        return outfile
+
+    def export_ili_line(self,child_el):
+        '''
+        return ili line of an eng-30 synset with lexical entries
+        (lemmas from the lexical entry index)
+
+        @type  child_el: lxml.etree._Element
+        @param child_el: child of the Lexicon element
+
+        @rtype: str
+        @return: line (None if child is not such a synset)
+        '''
+        if child_el.tag != 'Synset':
+            return None
+
+        ili = child_el.get('ili')
+        synset_id = child_el.get('id')
+        if synset_id.startswith('eng-30'):
+            offset_pos = synset_id.replace('eng-30-','')
+
+            lemmas = {le_el.find('Lemma').get('writtenForm')
+                      for le_el in self.synset_les.get(synset_id,[])}
+            if lemmas:
+                synonyms = ', '.join(sorted(lemmas))
+                return 'ili:{ili}\towl:sameAs\todwn13:{offset_pos} . # {synonyms}\n'.format(**locals())
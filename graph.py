@@ -0,0 +1,423 @@
+import hashlib
+from collections import defaultdict, OrderedDict, deque
+from array import array
+
+class Graph():
+    '''
+    compressed sparse row (CSR) adjacency arrays of the synset relations.
+
+    all SynsetRelation elements are compiled once into one CSR matrix per
+    relation type. synset identifiers are mapped to integers 0..n-1 (in
+    document order). the targets of synset i for a relation type are
+    indices[indptr[i]:indptr[i+1]].
+    the arrays are rebuilt lazily after the synsets have been modified.
+
+    the hypernym graph combines the has_hyperonym relations with the
+    inverse of the has_hyponym relations. ancestor closures over this graph
+    are memoized in a least recently used cache that holds at most
+    closure_cache_size ancestors in total.
+
+    the numpy module is needed.
+
+    >>> from wn_grid_parser import Wn_grid_parser
+    >>> instance = Wn_grid_parser("resources/test/odwn_test.xml.gz")
+    >>> instance.graph_int2id(1), instance.graph_id2int("eng-30-00000110-n")
+    ('eng-30-00000101-n', 10)
+    >>> indptr,indices = instance.graph_csr("has_hyponym")
+    >>> indptr.tolist(), indices.tolist()
+    ([0, 1, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5], [9, 7, 8, 10, 11])
+    >>> instance.graph_targets("eng-30-00000101-n","has_hyponym")
+    ['eng-30-00000107-n', 'eng-30-00000108-n', 'eng-30-00000110-n', 'eng-30-00000111-n']
+
+    the nouns 107, 108, 110 and 111 have a has_hyperonym relation to 101
+    and 101 has has_hyponym relations to them: the hypernym graph has
+    these edges once. verb 106 only has a has_hyperonym relation to 100.
+    >>> (indptr,indices),(hypo_indptr,hypo_indices) = instance.graph_hypernym_csr()
+    >>> indptr.tolist(), indices.tolist()
+    ([0, 0, 0, 0, 0, 0, 0, 1, 2, 3, 4, 5, 6], [0, 1, 1, 0, 1, 1])
+    >>> hypo_indptr.tolist(), hypo_indices.tolist()
+    ([0, 2, 6, 6, 6, 6, 6, 6, 6, 6, 6, 6, 6], [6, 9, 7, 8, 10, 11])
+    >>> instance.graph_hyponyms("eng-30-00000100-v")
+    ['eng-30-00000106-v', 'eng-30-00000109-v']
+    '''
+    hypernym_reltypes  = ['has_hyperonym']
+    hyponym_reltypes   = ['has_hyponym']
+    closure_cache_size = 2000000
+
+    def __init__(self):
+        pass
+
+    def graph_build(self):
+        '''
+        compile all SynsetRelation elements into CSR arrays and store
+        them in ivar graph_data:
+            'generation' -> ivar generation['Synset'] at the time of building
+            'ids'        -> list of synset identifiers (int -> identifier)
+            'id2int'     -> dict (identifier -> int)
+            'csr'        -> dict (reltype -> (indptr,indices))
+
+        relations with a target that is not an existing synset are ignored.
+        '''
+        self.stream_require_tree('graph_build')
+        import numpy
+
+        ids    = list(self.synset_els)
+        id2int = {sy_id: index for index,sy_id in enumerate(ids)}
+
+        sources = defaultdict(lambda: array('q'))
+        targets = defaultdict(lambda: array('q'))
+
+        for source,synset_el in enumerate(self.synset_els.values()):
+            for relation_el in synset_el.iterfind("SynsetRelations/SynsetRelation"):
+                target = id2int.get(relation_el.get("target"))
+                if target is not None:
+                    reltype = relation_el.get("relType")
+                    sources[reltype].append(source)
+                    targets[reltype].append(target)
+
+        csr = {}
+        for reltype,reltype_sources in sources.items():
+            #sources were added in increasing order
+            counts  = numpy.bincount(numpy.frombuffer(reltype_sources,
+                                                      dtype=numpy.int64),
+                                     minlength=len(ids))
+            indptr  = numpy.zeros(len(ids) + 1,dtype=numpy.int64)
+            numpy.cumsum(counts,out=indptr[1:])
+            indices = numpy.frombuffer(targets[reltype],dtype=numpy.int64)
+            csr[reltype] = (indptr,indices)
+
+        self.graph_data = {'generation' : self.generation['Synset'],
+                           'ids'        : ids,
+                           'id2int'     : id2int,
+                           'csr'        : csr,
+                           'closures'   : OrderedDict(),
+                           'closures_size' : 0}
+
+    def graph_get_data(self):
+        '''
+        return ivar graph_data, (re)built if the synsets were modified
+        since it was built
+
+        @rtype: dict
+        @return: see graph_build
+        '''
+        graph_data = getattr(self,'graph_data',None)
+        if graph_data is None or \
+           graph_data['generation'] != self.generation['Synset']:
+            self.graph_build()
+
+        return self.graph_data
+
+    def graph_csr(self,reltype):
+        '''
+        return CSR arrays of one relation type
+
+        @type  reltype: str
+        @param reltype: relation type (for example 'has_hyperonym')
+
+        @rtype: tuple
+        @return: (indptr,indices), numpy arrays.
+        both are empty if there are no relations of this type.
+        '''
+        import numpy
+
+        graph_data = self.graph_get_data()
+        if reltype in graph_data['csr']:
+            return graph_data['csr'][reltype]
+
+        return (numpy.zeros(len(graph_data['ids']) + 1,dtype=numpy.int64),
+                numpy.zeros(0,dtype=numpy.int64))
+
+    def graph_id2int(self,sy_id):
+        '''
+        return integer of synset identifier in the CSR arrays
+
+        @type  sy_id: str
+        @param sy_id: synset identifier (for example eng-30-00325085-v)
+
+        @rtype: int
+        @return: integer, None if the synset does not exist
+        '''
+        return self.graph_get_data()['id2int'].get(sy_id)
+
+    def graph_int2id(self,index):
+        '''
+        return synset identifier of integer in the CSR arrays
+
+        @type  index: int
+        @param index: integer of synset
+
+        @rtype: str
+        @return: synset identifier
+        '''
+        return self.graph_get_data()['ids'][index]
+
+    def graph_targets(self,sy_id,reltype):
+        '''
+        return the targets of a synset for one relation type
+
+        @type  sy_id: str
+        @param sy_id: synset identifier (for example eng-30-00325085-v)
+
+        @type  reltype: str
+        @param reltype: relation type (for example 'has_hyperonym')
+
+        @rtype: list
+        @return: list of synset identifiers
+        '''
+        index = self.graph_id2int(sy_id)
+        if index is None:
+            return []
+
+        ids            = self.graph_get_data()['ids']
+        indptr,indices = self.graph_csr(reltype)
+        return [ids[target] for target in indices[indptr[index]:indptr[index + 1]]]
+
+    def graph_transpose(self,indptr,indices):
+        '''
+        return transposed CSR arrays (all edges reversed)
+
+        @type  indptr: numpy.ndarray
+        @param indptr: CSR index pointer array
+
+        @type  indices: numpy.ndarray
+        @param indices: CSR target array
+
+        @rtype: tuple
+        @return: (indptr,indices) of the reversed edges
+        '''
+        import numpy
+
+        num_nodes = len(indptr) - 1
+        sources   = numpy.repeat(numpy.arange(num_nodes,dtype=numpy.int64),
+                                 numpy.diff(indptr))
+        order     = numpy.argsort(indices,kind='stable')
+
+        counts    = numpy.bincount(indices,minlength=num_nodes)
+        t_indptr  = numpy.zeros(num_nodes + 1,dtype=numpy.int64)
+        numpy.cumsum(counts,out=t_indptr[1:])
+        return (t_indptr,sources[order])
+
+    def graph_hypernym_csr(self):
+        '''
+        return CSR arrays of the hypernym graph (synset -> hypernyms)
+        and of the hyponym graph (synset -> hyponyms).
+        the hypernym graph combines the relations in class attribute
+        hypernym_reltypes with the inverse of the relations in
+        class attribute hyponym_reltypes (without duplicate edges).
+
+        @rtype: tuple
+        @return: ((indptr,indices) of hypernyms,(indptr,indices) of hyponyms)
+        '''
+        import numpy
+
+        graph_data = self.graph_get_data()
+        if 'hypernyms' in graph_data:
+            return graph_data['hypernyms'],graph_data['hyponyms']
+
+        num_nodes = len(graph_data['ids'])
+        sources   = []
+        targets   = []
+        for reltype in self.hypernym_reltypes:
+            indptr,indices = self.graph_csr(reltype)
+            sources.append(numpy.repeat(numpy.arange(num_nodes,dtype=numpy.int64),
+                                        numpy.diff(indptr)))
+            targets.append(indices)
+        for reltype in self.hyponym_reltypes:
+            indptr,indices = self.graph_csr(reltype)
+            sources.append(indices)
+            targets.append(numpy.repeat(numpy.arange(num_nodes,dtype=numpy.int64),
+                                        numpy.diff(indptr)))
+
+        #unique edges, sorted by source
+        edges   = numpy.unique(numpy.concatenate(sources) * num_nodes +
+                               numpy.concatenate(targets))
+        counts  = numpy.bincount(edges // num_nodes,minlength=num_nodes)
+        indptr  = numpy.zeros(num_nodes + 1,dtype=numpy.int64)
+        numpy.cumsum(counts,out=indptr[1:])
+        indices = edges % num_nodes
+
+        graph_data['hypernyms'] = (indptr,indices)
+        graph_data['hyponyms']  = self.graph_transpose(indptr,indices)
+        return graph_data['hypernyms'],graph_data['hyponyms']
+
+    def graph_hypernym_fingerprint(self):
+        '''
+        return fingerprint of the synset identifiers and the hypernym graph
+        (see graph_hypernym_csr), for example to check if stored results
+        were computed for the same hypernym structure
+
+        @rtype: str
+        @return: sha1 hash of the identifiers and the CSR arrays
+        '''
+        graph_data = self.graph_get_data()
+        if 'fingerprint' not in graph_data:
+            (indptr,indices),hyponyms = self.graph_hypernym_csr()
+            sha1 = hashlib.sha1()
+            sha1.update('\n'.join(graph_data['ids']).encode('utf-8'))
+            sha1.update(indptr.tobytes())
+            sha1.update(indices.tobytes())
+            graph_data['fingerprint'] = sha1.hexdigest()
+
+        return graph_data['fingerprint']
+
+    def graph_closure(self,index):
+        '''
+        return all ancestors of a synset in the hypernym graph
+        with their distance (the synset itself is included with distance 0).
+        results are memoized (see class attribute closure_cache_size).
+
+        @type  index: int
+        @param index: integer of synset (see graph_id2int)
+
+        @rtype: dict
+        @return: mapping from integer of ancestor -> shortest distance
+
+        >>> from wn_grid_parser import Wn_grid_parser
+        >>> instance = Wn_grid_parser("resources/test/odwn_test.xml.gz")
+        >>> instance.graph_closure(7)
+        {7: 0, 1: 1}
+        >>> instance.graph_hypernym_closure("eng-30-00000107-n")
+        {'eng-30-00000101-n': 1}
+        >>> instance.graph_is_a_many([("eng-30-00000107-n","eng-30-00000101-n"),
+        ...                           ("eng-30-00000101-n","eng-30-00000107-n"),
+        ...                           ("eng-30-00000107-n","unknown")]).tolist()
+        [True, False, False]
+
+        the least recently used closures are removed first
+        >>> instance.closure_cache_size = 4
+        >>> closure = instance.graph_closure(8)
+        >>> closure = instance.graph_closure(7)
+        >>> closure = instance.graph_closure(10)
+        >>> list(instance.graph_data['closures']), instance.graph_data['closures_size']
+        ([7, 10], 4)
+
+        the closures are computed again after the relations changed
+        >>> synset = instance.synsets_find_synset("eng-30-00000101-n")
+        >>> synset.add_relation("has_hyperonym","eng-30-00000102-n")
+        (True, '')
+        >>> instance.graph_hypernym_closure("eng-30-00000107-n")
+        {'eng-30-00000101-n': 1, 'eng-30-00000102-n': 2}
+        >>> synset.get_relations("has_hyperonym")[0].remove_me()
+        >>> instance.graph_hypernym_closure("eng-30-00000107-n")
+        {'eng-30-00000101-n': 1}
+        '''
+        graph_data = self.graph_get_data()
+        closures   = graph_data['closures']
+        if index in closures:
+            closures.move_to_end(index)
+            return closures[index]
+
+        (indptr,indices),hyponyms = self.graph_hypernym_csr()
+
+        distances = {index: 0}
+        queue     = deque([index])
+        while queue:
+            node = queue.popleft()
+            for hypernym in indices[indptr[node]:indptr[node + 1]].tolist():
+                if hypernym not in distances:
+                    distances[hypernym] = distances[node] + 1
+                    queue.append(hypernym)
+
+        closures[index] = distances
+        graph_data['closures_size'] += len(distances)
+        while graph_data['closures_size'] > self.closure_cache_size:
+            oldest,oldest_distances = closures.popitem(last=False)
+            graph_data['closures_size'] -= len(oldest_distances)
+
+        return distances
+
+    def graph_hypernym_closure(self,sy_id):
+        '''
+        return all (direct and indirect) hypernyms of a synset
+
+        @type  sy_id: str
+        @param sy_id: synset identifier (for example eng-30-00325085-v)
+
+        @rtype: dict
+        @return: mapping from synset identifier of hypernym -> shortest
+        distance. empty if the synset does not exist.
+        '''
+        index = self.graph_id2int(sy_id)
+        if index is None:
+            return {}
+
+        ids = self.graph_get_data()['ids']
+        return {ids[ancestor]: distance
+                for ancestor,distance in self.graph_closure(index).items()
+                if ancestor != index}
+
+    def graph_is_a(self,sy_id,hypernym_id):
+        '''
+        check if a synset is a kind of another synset, i.e.
+        if hypernym_id is sy_id or one of its (direct or indirect) hypernyms
+
+        @type  sy_id: str
+        @param sy_id: synset identifier (for example eng-30-00325085-v)
+
+        @type  hypernym_id: str
+        @param hypernym_id: synset identifier (for example eng-30-00322847-v)
+
+        @rtype: bool
+        @return: True if sy_id is a kind of hypernym_id, else False
+        '''
+        index          = self.graph_id2int(sy_id)
+        hypernym_index = self.graph_id2int(hypernym_id)
+        if index is None or hypernym_index is None:
+            return False
+
+        return hypernym_index in self.graph_closure(index)
+
+    def graph_is_a_many(self,pairs):
+        '''
+        batch version of graph_is_a
+
+        @type  pairs: iterable
+        @param pairs: iterable of tuples (sy_id,hypernym_id)
+
+        @rtype: numpy.ndarray
+        @return: boolean array with one value per pair
+        '''
+        import numpy
+
+        id2int = self.graph_get_data()['id2int']
+        pairs  = [(id2int.get(sy_id),id2int.get(hypernym_id))
+                  for sy_id,hypernym_id in pairs]
+
+        result = numpy.zeros(len(pairs),dtype=bool)
+        for position,(index,hypernym_index) in enumerate(pairs):
+            if index is not None and hypernym_index is not None:
+                result[position] = hypernym_index in self.graph_closure(index)
+
+        return result
+
+    def graph_hyponyms(self,sy_id):
+        '''
+        return all (direct and indirect) hyponyms of a synset.
+        only the subtree under the synset is visited.
+
+        @type  sy_id: str
+        @param sy_id: synset identifier (for example eng-30-00322847-v)
+
+        @rtype: list
+        @return: list of synset identifiers (breadth first order)
+        '''
+        index = self.graph_id2int(sy_id)
+        if index is None:
+            return []
+
+        hypernyms,(indptr,indices) = self.graph_hypernym_csr()
+
+        visited = {index}
+        queue   = deque([index])
+        order   = []
+        while queue:
+            node = queue.popleft()
+            for hyponym in indices[indptr[node]:indptr[node + 1]].tolist():
+                if hyponym not in visited:
+                    visited.add(hyponym)
+                    order.append(hyponym)
+                    queue.append(hyponym)
+
+        ids = self.graph_get_data()['ids']
+        return [ids[hyponym] for hyponym in order]
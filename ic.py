@@ -0,0 +1,247 @@
+import gzip
+import pickle
+from array import array
+
+class Ic():
+    '''
+    information content (IC) of synsets, computed from lemma frequencies.
+
+    the frequency of a lemma is divided over the synsets of its lexical
+    entries. the count of a synset is its own count plus the counts of
+    all its (direct and indirect) hyponyms in the hypernym graph
+    (see graph_hypernym_csr). the IC of a synset is
+    -log(count / total count of its pos).
+
+    ivar ic_data holds the counts per synset:
+        'ids'    -> list of synset identifiers
+        'counts' -> numpy array with counts of the synsets themselves
+        'ic'     -> numpy array with IC of the synsets
+        'fingerprint' -> hypernym graph the IC was computed for
+                         (see graph_hypernym_fingerprint)
+    the IC array for the current synsets is returned by ic_array.
+
+    the numpy module is needed.
+
+    >>> import math, os, shutil, tempfile
+    >>> from wn_grid_parser import Wn_grid_parser
+    >>> instance = Wn_grid_parser("resources/test/odwn_test.xml.gz")
+    >>> folder = tempfile.mkdtemp()
+    >>> path_freq = os.path.join(folder,"frequencies.tsv")
+    >>> with open(path_freq,"w") as outfile:
+    ...     size = outfile.write("huis\\tnoun\\t4\\nfiets\\t6\\nboom\\t2\\n")
+    >>> instance.ic_build(path_freq)
+
+    with smoothing 1, the 8 noun synsets count 19 in total: 101 counts 2
+    (boom), 108 counts 5 (huis), 102 and 110 count 4 (fiets).
+    101 also gets the counts of its hyponyms 107, 108, 110 and 111 (13)
+    >>> [round(instance.ic_synset(sy_id),4) for sy_id in ["eng-30-00000101-n",
+    ...                                                   "eng-30-00000108-n",
+    ...                                                   "eng-30-00000110-n",
+    ...                                                   "eng-30-00000107-n"]]
+    [0.3795, 1.335, 1.5581, 2.9444]
+    >>> round(-math.log(13 / 19),4), round(-math.log(5 / 19),4)
+    (0.3795, 1.335)
+
+    resnik is the IC of 101, lin is 2 * 0.3795 / (1.335 + 1.5581) and
+    jcn is 1 / (1.335 + 1.5581 - 2 * 0.3795)
+    >>> ids1 = ["eng-30-00000108-n"] * 3
+    >>> ids2 = ["eng-30-00000110-n","eng-30-00000102-n","eng-30-00000109-v"]
+    >>> for measure in [instance.similarity_resnik,
+    ...                 instance.similarity_lin,
+    ...                 instance.similarity_jcn]:
+    ...     print([round(score,4) for score in measure(ids1,ids2).tolist()])
+    [0.3795, nan, nan]
+    [0.2623, nan, nan]
+    [0.4686, nan, nan]
+
+    a stored IC is only used for the same hypernym graph
+    >>> path_ic = os.path.join(folder,"ic.bin")
+    >>> instance.ic_write(path_ic)
+    >>> loaded = Wn_grid_parser("resources/test/odwn_test.xml.gz")
+    >>> loaded.ic_load(path_ic)
+    >>> loaded.ic_array() is loaded.ic_data['ic']
+    True
+    >>> changed = Wn_grid_parser("resources/test/odwn_test.xml.gz")
+    >>> changed.synsets_find_synset("eng-30-00000101-n").add_relation("has_hyperonym",
+    ...                                                              "eng-30-00000102-n")
+    (True, '')
+    >>> changed.ic_load(path_ic)
+    >>> changed.ic_array() is changed.ic_data['ic']
+    False
+    >>> round(changed.ic_synset("eng-30-00000102-n"),4), round(-math.log(17 / 19),4)
+    (0.1112, 0.1112)
+    >>> shutil.rmtree(folder)
+    '''
+    def __init__(self):
+        pass
+
+    def ic_read_frequencies(self,path_freq):
+        '''
+        read lemma frequency file (.gz files are decompressed).
+        each line contains a lemma and its frequency separated by a tab,
+        optionally with the pos in between: lemma<TAB>pos<TAB>frequency
+        (pos is noun | verb | adjective). lines starting with # are ignored.
+
+        @type  path_freq: str
+        @param path_freq: path to lemma frequency file
+
+        @rtype: dict
+        @return: mapping (lemma,pos) -> frequency (pos is None if not given)
+        '''
+        frequencies = {}
+        opener      = gzip.open if path_freq.endswith('.gz') else open
+
+        with opener(path_freq,'rt',encoding='utf-8') as infile:
+            for line in infile:
+                line = line.rstrip('\n')
+                if not line or line.startswith('#'):
+                    continue
+
+                fields = line.split('\t')
+                lemma  = fields[0]
+                pos    = fields[1] if len(fields) == 3 else None
+                key    = (lemma,pos)
+                frequencies[key] = frequencies.get(key,0.0) + float(fields[-1])
+
+        return frequencies
+
+    def ic_build(self,path_freq,smoothing=1.0):
+        '''
+        compute the IC of all synsets from a lemma frequency file
+        and store it in ivar ic_data
+
+        @type  path_freq: str
+        @param path_freq: path to lemma frequency file
+        (see ic_read_frequencies)
+
+        @type  smoothing: float
+        @param smoothing: count added to every synset (default is 1.0),
+        so that synsets of unseen lemmas do not get an infinite IC.
+        '''
+        self.stream_require_tree('ic_build')
+        import numpy
+
+        graph_data = self.graph_get_data()
+        id2int     = graph_data['id2int']
+        counts     = numpy.full(len(graph_data['ids']),float(smoothing))
+
+        for (lemma,pos),frequency in self.ic_read_frequencies(path_freq).items():
+            synsets = [id2int[le_el.find("Sense").get("synset")]
+                       for le_el in self.lemma_les_els(lemma,pos)
+                       if le_el.find("Sense").get("synset") in id2int]
+            for index in synsets:
+                counts[index] += frequency / len(synsets)
+
+        self.ic_data = {'ids'    : graph_data['ids'],
+                        'counts' : counts,
+                        'ic'     : self.ic_propagate(counts),
+                        'fingerprint' : self.graph_hypernym_fingerprint()}
+        graph_data['ic'] = self.ic_data['ic']
+
+    def ic_propagate(self,counts):
+        '''
+        compute IC from the counts of the synsets themselves
+
+        @type  counts: numpy.ndarray
+        @param counts: count per synset (aligned with graph_int2id)
+
+        @rtype: numpy.ndarray
+        @return: IC per synset (inf if the count is 0)
+        '''
+        import numpy
+
+        ancestors = array('q')
+        weights   = array('d')
+        for index in numpy.flatnonzero(counts).tolist():
+            closure = self.graph_closure(index)
+            ancestors.extend(closure)
+            weights.extend([counts[index]] * len(closure))
+
+        #every synset counts once for each of its ancestors
+        totals = numpy.bincount(numpy.frombuffer(ancestors,dtype=numpy.int64),
+                                weights=numpy.frombuffer(weights,dtype=numpy.float64),
+                                minlength=len(counts))
+
+        pos          = numpy.array([sy_id[-1] for sy_id in self.graph_get_data()['ids']])
+        pos_totals   = numpy.zeros(len(counts))
+        for pos_value in set(pos.tolist()):
+            pos_mask = pos == pos_value
+            pos_totals[pos_mask] = counts[pos_mask].sum()
+
+        ic = numpy.full(len(counts),numpy.inf)
+        nonzero = totals > 0
+        ic[nonzero] = -numpy.log(totals[nonzero] / pos_totals[nonzero])
+        return ic
+
+    def ic_array(self):
+        '''
+        return IC per synset of the current synsets (see ic_build or ic_load).
+        if the hypernym graph differs from the one the IC was computed for,
+        the counts are propagated again.
+
+        @rtype: numpy.ndarray
+        @return: IC per synset (aligned with graph_int2id)
+
+        @raise RuntimeError: if there is no IC (see ic_build and ic_load)
+        '''
+        import numpy
+
+        graph_data = self.graph_get_data()
+        if 'ic' in graph_data:
+            return graph_data['ic']
+
+        ic_data = getattr(self,'ic_data',None)
+        if ic_data is None:
+            raise RuntimeError('no IC available, call ic_build or ic_load first')
+
+        if ic_data.get('fingerprint') == self.graph_hypernym_fingerprint():
+            graph_data['ic'] = ic_data['ic']
+        else:
+            counts     = numpy.zeros(len(graph_data['ids']))
+            id2int     = graph_data['id2int']
+            for sy_id,count in zip(ic_data['ids'],ic_data['counts'].tolist()):
+                if sy_id in id2int:
+                    counts[id2int[sy_id]] = count
+            graph_data['ic'] = self.ic_propagate(counts)
+
+        return graph_data['ic']
+
+    def ic_write(self,output_path):
+        '''
+        store ivar ic_data as pickle
+
+        @type  output_path: str
+        @param output_path: output path (for example ic_sonar.bin)
+        '''
+        with open(output_path,'wb') as outfile:
+            pickle.dump(self.ic_data,outfile,pickle.HIGHEST_PROTOCOL)
+
+    def ic_load(self,path):
+        '''
+        load ivar ic_data from pickle (see ic_write).
+        the stored IC is used if it was computed for the same hypernym graph
+        (see ic_array), else it is computed again from the stored counts.
+
+        @type  path: str
+        @param path: path to pickle
+        '''
+        with open(path,'rb') as infile:
+            self.ic_data = pickle.load(infile)
+
+        self.graph_get_data().pop('ic',None)
+
+    def ic_synset(self,sy_id):
+        '''
+        return IC of a synset
+
+        @type  sy_id: str
+        @param sy_id: synset identifier (for example eng-30-00325085-v)
+
+        @rtype: float
+        @return: IC, None if the synset does not exist
+        '''
+        index = self.graph_id2int(sy_id)
+        if index is None:
+            return None
+
+        return float(self.ic_array()[index])
@@ -0,0 +1,165 @@
+import os
+import gzip
+import pickle
+from array import array
+
+class Ili():
+    '''
+    bidirectional mapping between ili identifiers and eng-30 synset
+    identifiers, read from resources/ili.nt.gz:
+
+    <http://globalwordnet.org/ili/i117659>
+    <http://www.w3.org/2002/07/owl#sameAs>
+    <http://wordnet-rdf.princeton.edu/wn30/eng-15300051-n>
+    .
+
+    the mapping is parsed once and stored in a binary sidecar next to the
+    N-Triples file (ili.nt.gz.index.bin), later loads read the sidecar.
+    in the sidecar, the offsets, pos and ili numbers are stored as arrays
+    (identifiers that do not have the form eng-30-OFFSET-POS and iNUMBER
+    are stored as they are).
+
+    ivar ili_index holds the mapping:
+        'synset' -> mapping eng-30 synset identifier -> ili
+        'ili'    -> mapping ili -> eng-30 synset identifier
+    '''
+    def __init__(self):
+        pass
+
+    def ili_nt_path(self):
+        '''
+        return path to N-Triples file with the mapping
+
+        @rtype: str
+        @return: path to resources/ili.nt.gz
+        '''
+        return os.path.join(self.cwd,'resources','ili.nt.gz')
+
+    def ili_read_nt(self,file_object):
+        '''
+        read mapping from N-Triples lines (str or bytes)
+
+        @type  file_object: file object
+        @param file_object: file object of ili.nt(.gz)
+
+        @rtype: dict
+        @return: mapping eng-30 synset identifier -> ili
+        '''
+        mapping = {}
+
+        for line in file_object:
+            if isinstance(line,bytes):
+                line = line.decode('utf-8')
+
+            if 'http://www.w3.org/2002/07/owl#sameAs>' in line:
+                s,r,o,e = line.strip().split()
+                ili = s.split('/ili/')[1][:-1]
+                eng = o.split('/wn30/')[1][:-1]
+                eng = eng.replace('eng-','eng-30-')
+                mapping[eng] = ili
+
+        return mapping
+
+    def ili_set_index(self,mapping):
+        '''
+        set ivar ili_index (and ivar ili_dict) from mapping
+
+        @type  mapping: dict
+        @param mapping: mapping eng-30 synset identifier -> ili
+        '''
+        self.ili_index = {'synset' : mapping,
+                          'ili'    : {ili: sy_id for sy_id,ili in mapping.items()}}
+        self.ili_dict  = mapping
+
+    def ili_load_index(self,path_nt=None):
+        '''
+        load ivar ili_index from the sidecar of path_nt. if the sidecar
+        does not exist or path_nt changed since it was written,
+        path_nt is parsed and the sidecar is (re)written.
+
+        @type  path_nt: str
+        @param path_nt: [optional]. path to N-Triples file
+        (default is ili_nt_path())
+        '''
+        if path_nt is None:
+            path_nt = self.ili_nt_path()
+
+        path_sidecar = path_nt + '.index.bin'
+        key = (os.path.getsize(path_nt),os.path.getmtime(path_nt))
+
+        if os.path.exists(path_sidecar):
+            with open(path_sidecar,'rb') as infile:
+                sidecar = pickle.load(infile)
+
+            if sidecar['key'] == key:
+                mapping = {'eng-30-%08d-%s' % (offset,pos) : 'i%d' % number
+                           for offset,pos,number in zip(sidecar['offsets'],
+                                                        sidecar['pos'],
+                                                        sidecar['ilis'])}
+                mapping.update(sidecar['other'])
+                self.ili_set_index(mapping)
+                return
+
+        if path_nt.endswith('.gz'):
+            infile = gzip.GzipFile(path_nt)
+        else:
+            infile = open(path_nt,'rb')
+
+        with infile:
+            mapping = self.ili_read_nt(infile)
+        self.ili_set_index(mapping)
+
+        sidecar = {'key'     : key,
+                   'offsets' : array('L'),
+                   'pos'     : [],
+                   'ilis'    : array('L'),
+                   'other'   : {}}
+
+        for sy_id,ili in mapping.items():
+            parts = sy_id.split('-')
+            if all([len(parts) == 4,
+                    sy_id.startswith('eng-30-'),
+                    len(parts[2]) == 8,
+                    parts[2].isdigit(),
+                    ili.startswith('i'),
+                    ili[1:].isdigit(),
+                    ili[1:2] != '0']):
+                sidecar['offsets'].append(int(parts[2]))
+                sidecar['pos'].append(parts[3])
+                sidecar['ilis'].append(int(ili[1:]))
+            else:
+                sidecar['other'][sy_id] = ili
+
+        sidecar['pos'] = ''.join(sidecar['pos'])
+
+        with open(path_sidecar,'wb') as outfile:
+            pickle.dump(sidecar,outfile,protocol=pickle.HIGHEST_PROTOCOL)
+
+    def ili_for(self,sy_id):
+        '''
+        return ili of eng-30 synset identifier
+
+        @type  sy_id: str
+        @param sy_id: synset identifier (for example 'eng-30-00324560-v')
+
+        @rtype: str
+        @return: ili (for example 'i23355'), None if not found
+        '''
+        if getattr(self,'ili_index',None) is None:
+            self.ili_load_index()
+        return self.ili_index['synset'].get(sy_id)
+
+    def synset_for(self,ili):
+        '''
+        return eng-30 synset identifier of ili
+
+        @type  ili: str
+        @param ili: ili (for example 'i23355')
+
+        @rtype: str
+        @return: synset identifier (for example 'eng-30-00324560-v'),
+        None if not found
+        '''
+        if getattr(self,'ili_index',None) is None:
+            self.ili_load_index()
+        return self.ili_index['ili'].get(ili)
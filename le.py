@@ -10,11 +10,16 @@ class Le():
         <Sense id="o_n-109910434" 
                provenance="cdb2.2_Auto" 
                synset="eng-30-08633957-n/> 
+    
+    @type  parser: Wn_grid_parser
+    @param parser: [optional]. if provided, the indexes of the parser
+    are updated when the lexical entry is removed
     '''
-    def __init__(self,le_el,lexicon_el):
+    def __init__(self,le_el,lexicon_el,parser=None):
         self.le_el    = le_el
         self.sense_el = self.le_el.find("Sense") 
         self.lexicon_el = lexicon_el
+        self.parser   = parser
         
     
     def get_id(self):
@@ -115,9 +120,19 @@ class Le():
     def remove_me(self):
         '''
         remove lexical entry element
+        (queued if the parser is in a batch, see Batch)
         '''
+        if self.parser is not None:
+            self.parser.stream_require_tree('Le.remove_me')
+        
+        if self.parser is not None and self.parser.batch_active():
+            return self.parser.batch_remove(self.le_el)
+        
         try:
             self.lexicon_el.remove(self.le_el)
-            return (True,'')
         except ValueError:
             return (False,'could not remove %s' % self.get_id())
+        
+        if self.parser is not None:
+            self.parser.unindex_element(self.le_el)
+        return (True,'')
@@ -1,12 +1,64 @@
 from collections import defaultdict 
+from le import Le
 
 class Lemma():
     '''
     methods to access and manipulate resource lemma based
+    
+    ivar lemma_les maps lemma -> pos -> list of LexicalEntry elements
     '''
     def __init__(self):
         pass
     
+    def lemma_index_le(self,le):
+        '''
+        add LexicalEntry element to the lemma index.
+        multi-words are ignored (as in les_get_generator)
+        
+        @type  le: accumulators.LeRecord
+        @param le: values of LexicalEntry element
+        '''
+        if "mwe" in le.le_id:
+            return
+        
+        self.lemma_les[le.lemma].setdefault(le.pos,[]).append(le.le_el)
+    
+    def lemma_unindex_le(self,le):
+        '''
+        remove LexicalEntry element from the lemma index
+        
+        @type  le: accumulators.LeRecord
+        @param le: values of LexicalEntry element
+        '''
+        pos_les = self.lemma_les.get(le.lemma,{})
+        if le.le_el in pos_les.get(le.pos,[]):
+            pos_les[le.pos].remove(le.le_el)
+            if not pos_les[le.pos]:
+                del pos_les[le.pos]
+            if not pos_les:
+                del self.lemma_les[le.lemma]
+    
+    def lemma_les_els(self,lemma,pos=None):
+        '''
+        return LexicalEntry elements of lemma from the lemma index
+        
+        @type  lemma: str
+        @param lemma: lemma
+        
+        @type  pos: str
+        @param pos: noun | verb. 
+        Default is None, then no filtering is performed.
+        
+        @rtype: list
+        @return: list of LexicalEntry elements
+        '''
+        self.stream_require_tree('lemma_les_els')
+        pos_les = self.lemma_les.get(lemma,{})
+        if pos:
+            return pos_les.get(pos,[])
+        
+        return [le_el for les in pos_les.values() for le_el in les]
+    
     def lemmas_generator(self,pos=None):
         '''
         return dict of all lemmas
@@ -15,18 +67,17 @@ class Lemma():
         @param pos: noun | verb. 
         Default is None, then no filtering is performed.
         '''
+        self.stream_require_tree('lemmas_generator')
         lemmas = defaultdict(int)
         
-        for le_obj in self.les_get_generator():
-            lemma = le_obj.get_lemma()
+        for lemma,pos_les in self.lemma_les.items():
             
             if pos:
-                part_of_speech = le_obj.get_pos()
-                if pos == part_of_speech:
-                    lemmas[lemma] += 1
+                if pos in pos_les:
+                    lemmas[lemma] += len(pos_les[pos])
     
             else:
-                lemmas[lemma] += 1
+                lemmas[lemma] += sum(len(les) for les in pos_les.values())
         
         return lemmas
         
@@ -44,22 +95,9 @@ class Lemma():
         @rtype: list
         @return: list of Le class instances
         '''
-        les = []
-        
-        for le_obj in self.les_get_generator():
-            can_lemma = le_obj.get_lemma()
-            
-            if can_lemma == lemma:
-                
-                if pos:
-                    part_of_speech = le_obj.get_pos()
-                    if pos == part_of_speech:
-                        les.append(le_obj)
-    
-                else:
-                    les.append(le_obj)
-        
-        return les
+        self.stream_require_tree('lemma_get_generator')
+        return [Le(le_el,self.lexicon_el,self)
+                for le_el in self.lemma_les_els(lemma,pos)]
     
     def lemma_num_senses(self,lemma,pos=None):
         '''
@@ -75,7 +113,8 @@ class Lemma():
         @rtype: int
         @return: number of senses
         '''
-        return len(self.lemma_get_generator(lemma, pos))
+        self.stream_require_tree('lemma_num_senses')
+        return len(self.lemma_les_els(lemma, pos))
     
     
     def lemma_highest_sense_number(self,lemma,pos=None):
@@ -92,9 +131,10 @@ class Lemma():
         @rtype: int
         @return: highest sense number
         '''
+        self.stream_require_tree('lemma_highest_sense_number')
         highest = 0
-        for le_obj in self.lemma_get_generator(lemma, pos):
-            sense_id = int(le_obj.get_sense_number())
+        for le_el in self.lemma_les_els(lemma, pos):
+            sense_id = int(le_el.find("Sense").get("senseId"))
             
             if sense_id > highest:
                 highest = sense_id
@@ -1,3 +1,5 @@
+import os
+import pickle
 from collections import defaultdict
 from le import Le
 from random import randint
@@ -25,8 +27,13 @@ class Les():
         @rtype: generator
         @return: generator of LexicalEntry XML elements
         '''
-        for le_el in self.doc.iterfind(self.path_to_le_els):
-            instance = Le(le_el,self.lexicon_el)
+        if self.mode == "stream":
+            le_els = self.stream_iter("LexicalEntry")
+        else:
+            le_els = self.doc.iterfind(self.path_to_le_els)
+        
+        for le_el in le_els:
+            instance = Le(le_el,self.lexicon_el,self)
             le_id    = instance.get_id()
             if mw:
                 yield instance
@@ -34,6 +41,42 @@ class Les():
                 yield instance
 
 
+    def les_index_le(self,le):
+        '''
+        add LexicalEntry element to the lexical entry indexes.
+        multi-words are ignored (as in les_get_generator)
+        
+        @type  le: accumulators.LeRecord
+        @param le: values of LexicalEntry element
+        '''
+        if "mwe" in le.le_id:
+            return
+        
+        self.orbn_ids[le.sense_id] = ""
+        
+        #first element in document order is found by les_find_le
+        self.le_els.setdefault(le.le_id,le.le_el)
+        
+        self.synset_les[le.synset].append(le.le_el)
+    
+    def les_unindex_le(self,le):
+        '''
+        remove LexicalEntry element from the lexical entry indexes.
+        sense ids stay in ivar orbn_ids, so that they are not reused.
+        
+        @type  le: accumulators.LeRecord
+        @param le: values of LexicalEntry element
+        '''
+        le_el = le.le_el
+        if self.le_els.get(le.le_id) is le_el:
+            del self.le_els[le.le_id]
+        
+        sy_id = le.synset
+        if le_el in self.synset_les.get(sy_id,[]):
+            self.synset_les[sy_id].remove(le_el)
+            if not self.synset_les[sy_id]:
+                del self.synset_les[sy_id]
+
     def les_find_le(self,le_identifier):
         '''
         find lexical entry based on identifier
@@ -45,9 +88,10 @@ class Les():
         @rtype: instance
         @return: if found, instance of class Le, else None
         '''
-        for le_el in self.les_get_generator():
-            if le_el.get_id() == le_identifier:
-                return le_el
+        self.stream_require_tree('les_find_le')
+        le_el = self.le_els.get(le_identifier)
+        if le_el is not None:
+            return Le(le_el,self.lexicon_el,self)
         else:
             return None
         
@@ -59,8 +103,9 @@ class Les():
         @rtype: list
         @return: list of class instances of Class Le
         '''
-        return [le_el for le_el in self.les_get_generator()
-                if le_el.get_synset_id() == synset_identifier]
+        self.stream_require_tree('les_all_les_of_one_synset')
+        return [Le(le_el,self.lexicon_el,self)
+                for le_el in self.synset_les.get(synset_identifier,[])]
         
     def les_add_le(self,lemma,
                         long_pos,
@@ -79,6 +124,9 @@ class Les():
         
         WARNING: if sense_id already exists for this lemma, le will not be added
         
+        WARNING: if the lexical entry identifier already exists
+        (for example because sense_number is given), le will not be added
+        
         if sense_id and le_sense_id are not provided, new ones will be created
         
         @type  lemma: str
@@ -127,7 +175,16 @@ class Les():
     
         @rtype: tuple
         @return: (succes,message)
+
+        >>> from wn_grid_parser import Wn_grid_parser
+        >>> instance = Wn_grid_parser("resources/test/odwn_test.xml.gz")
+        >>> instance.les_add_le("boom","noun","n","eng-30-00000102-n",["test"],
+        ...                     sense_id="o_n-000000001",sense_number=2)
+        (False, 'lexical entry exists already: boom-n-2')
+        >>> instance.les_find_le("boom-n-2").get_synset_id()
+        'eng-30-00000101-n'
         '''
+        self.stream_require_tree('les_add_le')
         all_les_of_one_synset = [le_obj
               for le_obj in self.les_all_les_of_one_synset(synset_identifier)]
         
@@ -139,17 +196,17 @@ class Les():
                 #change provenance
                 if (lemma,long_pos) == (l,p):
                     provenance_tag = le_obj.get_provenance()
-                    for provance in provenances:
+                    for provenance in provenances:
                         if provenance not in provenance_tag:
                             provenance_tag += "+"+provenance
-                    le_obj.sense_el.attrib['provenance'] = provenance_tag
+                    self.les_set_provenance(le_obj,provenance_tag)
                 
                 #change annotator tag if needed
                 if annotator is not None:
                     annotator_tag = le_obj.get_annotator()
                     if annotator not in annotator_tag:
                         annotator_tag += '+'+annotator
-                    le_obj.sense_el.attrib['annotator'] = annotator_tag 
+                    self.les_set_annotator(le_obj,annotator_tag)
                     
                 
         #WARNING:if sense_id already exists for this lemma,le will not be added
@@ -161,14 +218,56 @@ class Les():
             return (False,
                     "sense_id %s already in sense ids of synset" % sense_id)
         
+        #create lexical entry
+        if sense_number is None:
+            sense_number = max(self.lemma_highest_sense_number(lemma,pos=long_pos),
+                               self.batch_highest_sense_number(lemma,long_pos))+1
+        
+        #WARNING: if the identifier already exists, le will not be added
+        #(les_find_le and the indexes keep the existing entry)
+        le_id = "%s-%s-%s" % (lemma,short_pos,sense_number)
+        if le_id in self.le_els:
+            return (False,"lexical entry exists already: %s" % le_id)
+        
         #create orbn_id
         if sense_id is None:
             sense_id = self.les_new_le_sense_id(short_pos)
 
-        #create lexical entry
-        if sense_number is None:
-            sense_number = self.lemma_highest_sense_number(lemma,pos=long_pos)+1
+        new_le_el = self.les_new_le_el(lemma,
+                                       long_pos,
+                                       short_pos,
+                                       synset_identifier,
+                                       provenances,
+                                       definition,
+                                       sense_id,
+                                       sense_number,
+                                       annotator)
+        
+        if self.batch_active():
+            self.batch_add(new_le_el)
+            return (True,"")
+        
+        self.lexicon_el.insert(0,new_le_el)
+        self.index_element(new_le_el)
+        self.orbn_ids[sense_id] = ""
+        return (True,"")
+        
+    def les_new_le_el(self,lemma,
+                           long_pos,
+                           short_pos,
+                           synset_identifier,
+                           provenances,
+                           definition,
+                           sense_id,
+                           sense_number,
+                           annotator=None):
+        '''
+        create (but do not add) a LexicalEntry element
+        (see les_add_le for the parameters and an example)
         
+        @rtype: lxml.etree._Element
+        @return: LexicalEntry element
+        '''
         #<LexicalEntry id="leuningstoel-n-1" partOfSpeech="noun">
         le_att={'id': "{lemma}-{short_pos}-{sense_number}".format(**locals()),
                 'partOfSpeech': long_pos}
@@ -209,11 +308,183 @@ class Les():
                     
             
             new_le_el.append(new_sub_el)
-            
-        self.lexicon_el.insert(0,new_le_el)
-        self.orbn_ids[sense_id] = ""
-        return (True,"")
         
+        return new_le_el
+    
+    def les_add_many(self,rows,path_counter=None):
+        '''
+        add many lexical entries at once. each row is a dict with the
+        parameters of les_add_le ('lemma','long_pos','short_pos',
+        'synset_identifier','provenances' and optionally 'definition',
+        'sense_id','sense_number' and 'annotator').
+        
+        (1) rows of which lemma,pos already occurs in the synset
+        (according to the lemma index) or in an earlier row are not added,
+        the provenance (and annotator) of that entry is extended instead
+        (2) rows of which the sense id or the entry identifier
+        already exists are not added
+        (3) sense ids that are not provided are allocated sequentially
+        from a counter that is stored in path_counter
+        (4) the new elements are added in one batch (see Batch)
+        
+        @type  rows: iterable
+        @param rows: iterable of dicts (see above)
+        
+        @type  path_counter: str
+        @param path_counter: [optional]. path to pickled sense id counter.
+        default is next to ivar path_wn_grid_lmf
+        (for example odwn_orbn_gwg-LMF_1.3.xml.gz.sense_id_counter.bin)
+        
+        @rtype: list
+        @return: list of tuples (succes,message), one per row.
+        if a row is added, message is the identifier of the new entry.
+
+        >>> import os, pickle, shutil, tempfile
+        >>> from wn_grid_parser import Wn_grid_parser
+        >>> instance = Wn_grid_parser("resources/test/odwn_test.xml.gz")
+        >>> folder = tempfile.mkdtemp()
+        >>> path_counter = os.path.join(folder,"sense_id_counter.bin")
+        >>> row = {'lemma': 'nieuw', 'long_pos': 'noun', 'short_pos': 'n',
+        ...        'synset_identifier': 'eng-30-00000101-n',
+        ...        'provenances': ['test']}
+
+        a lemma,pos that occurs twice in one call is added once
+        >>> instance.les_add_many([row,dict(row,provenances=['other'])],
+        ...                       path_counter=path_counter)
+        [(True, 'nieuw-n-1'), (False, 'exists already: nieuw-n-1')]
+        >>> le_obj = instance.les_find_le("nieuw-n-1")
+        >>> le_obj.get_sense_id(), le_obj.get_provenance()
+        ('o_n-000000001', 'test+other')
+
+        existing entries get the annotator of the row
+        >>> instance.les_add_many([dict(row,lemma='boom',annotator='me')],
+        ...                       path_counter=path_counter)
+        [(False, 'exists already: boom-n-2')]
+        >>> instance.les_find_le("boom-n-2").get_annotator()
+        'me'
+
+        the counter is stored, so a later call continues from it
+        >>> instance.les_add_many([dict(row,lemma='ander')],
+        ...                       path_counter=path_counter)
+        [(True, 'ander-n-1')]
+        >>> instance.les_find_le("ander-n-1").get_sense_id()
+        'o_n-000000002'
+        >>> with open(path_counter,'rb') as infile:
+        ...     counter = pickle.load(infile)
+        >>> counter
+        2
+        >>> shutil.rmtree(folder)
+        '''
+        self.stream_require_tree('les_add_many')
+        if path_counter is None:
+            path_counter = self.path_wn_grid_lmf + '.sense_id_counter.bin'
+        
+        counter = 0
+        if os.path.exists(path_counter):
+            with open(path_counter,'rb') as infile:
+                counter = pickle.load(infile)
+        
+        report          = []
+        added           = {}
+        provenance_tags = {}
+        annotator_tags  = {}
+        new_le_ids      = set()
+        
+        with self.batch():
+            for row in rows:
+                lemma             = row['lemma']
+                long_pos          = row['long_pos']
+                synset_identifier = row['synset_identifier']
+                provenances       = row['provenances']
+                sense_id          = row.get('sense_id')
+                sense_number      = row.get('sense_number')
+                
+                #(1) lemma,pos already occurs in synset or in an earlier row
+                key   = (lemma,long_pos,synset_identifier)
+                le_el = added.get(key)
+                if le_el is None:
+                    for candidate_el in self.lemma_les_els(lemma,long_pos):
+                        if candidate_el.find("Sense").get("synset") == synset_identifier:
+                            le_el = candidate_el
+                            break
+                
+                if le_el is not None:
+                    le_obj = Le(le_el,self.lexicon_el,self)
+                    provenance_tag = provenance_tags.get(le_el,le_obj.get_provenance())
+                    for provenance in provenances:
+                        if provenance not in provenance_tag:
+                            provenance_tag += "+"+provenance
+                    
+                    #entries of earlier rows are not yet in the document
+                    if le_el.getparent() is None:
+                        le_obj.sense_el.attrib['provenance'] = provenance_tag
+                    else:
+                        self.les_set_provenance(le_obj,provenance_tag)
+                    
+                    provenance_tags[le_el] = provenance_tag
+                    
+                    #change annotator tag if needed (as in les_add_le)
+                    annotator = row.get('annotator')
+                    if annotator is not None:
+                        annotator_tag = annotator_tags.get(le_el,le_obj.get_annotator())
+                        if not annotator_tag:
+                            annotator_tag = annotator
+                        elif annotator not in annotator_tag:
+                            annotator_tag += "+"+annotator
+                        
+                        if le_el.getparent() is None:
+                            le_obj.sense_el.attrib['annotator'] = annotator_tag
+                        else:
+                            self.les_set_annotator(le_obj,annotator_tag)
+                        
+                        annotator_tags[le_el] = annotator_tag
+                    
+                    added[key] = le_el
+                    report.append((False,"exists already: %s" % le_obj.get_id()))
+                    continue
+                
+                #(2) sense id or entry identifier already exists
+                if sense_id is not None and sense_id in self.orbn_ids:
+                    report.append((False,"sense_id exists already: %s" % sense_id))
+                    continue
+                
+                #(3) allocate sense id
+                while sense_id is None:
+                    counter += 1
+                    candidate = "o_n-%09d" % counter
+                    if candidate not in self.orbn_ids:
+                        sense_id = candidate
+                
+                if sense_number is None:
+                    sense_number = max(self.lemma_highest_sense_number(lemma,pos=long_pos),
+                                       self.batch_highest_sense_number(lemma,long_pos))+1
+                
+                new_le_el = self.les_new_le_el(lemma,
+                                               long_pos,
+                                               row['short_pos'],
+                                               synset_identifier,
+                                               provenances,
+                                               row.get('definition',""),
+                                               sense_id,
+                                               sense_number,
+                                               row.get('annotator'))
+                le_id = new_le_el.get("id")
+                if any([le_id in self.le_els,
+                        le_id in new_le_ids]):
+                    report.append((False,"lexical entry exists already: %s" % le_id))
+                    continue
+                
+                #(4) add in batch
+                self.batch_add(new_le_el)
+                added[key] = new_le_el
+                new_le_ids.add(le_id)
+                report.append((True,le_id))
+        
+        with open(path_counter,'wb') as outfile:
+            pickle.dump(counter,outfile)
+        
+        return report
+    
     def les_remove_le(self,le_identifier):
         '''
         method tries to remove a LexicalEntry. for example
@@ -229,6 +500,7 @@ class Les():
         @param le_identifier: lexicalentry identifier, which is the value of 
         the 'id' attribute of the LexicalEntry element
         '''
+        self.stream_require_tree('les_remove_le')
         le_obj = self.les_find_le(le_identifier)
         
         if le_obj is not None:
@@ -241,6 +513,32 @@ class Les():
             #if len(all_les_of_sy_id) == 1:
             #    self.synsets_remove_synset(sy_id,remove_les=False)
     
+    def les_remove_many(self,le_identifiers):
+        '''
+        remove all LexicalEntry elements of which the identifier is in
+        le_identifiers. the children of the Lexicon element are scanned
+        once and the elements are removed in a batch (see Batch).
+        
+        @type  le_identifiers: iterable
+        @param le_identifiers: lexical entry identifiers
+        (for example ['havermout-n-1','boom-n-2'])
+        
+        @rtype: set
+        @return: identifiers that were not found
+        '''
+        self.stream_require_tree('les_remove_many')
+        le_identifiers = set(le_identifiers)
+        found          = set()
+        
+        with self.batch():
+            for le_el in self.lexicon_el.iterchildren("LexicalEntry"):
+                le_id = le_el.get("id")
+                if le_id in le_identifiers:
+                    self.batch_remove(le_el)
+                    found.add(le_id)
+        
+        return le_identifiers - found
+    
     def les_remove_a_resource(self,resource):
         '''
         this method loop sover all LexicalEntry elements and checks
@@ -250,6 +548,7 @@ class Les():
         (3) if the resource is in the resource, but not the only
         resource -> resource is removed from tag
         '''
+        self.stream_require_tree('les_remove_a_resource')
         for le_obj in self.les_get_generator():
             
             provenance_tag = le_obj.get_provenance()
@@ -265,7 +564,51 @@ class Les():
                 else:
                     resources.remove(resource)
                     provenance_tag = "+".join(resources)
-                    le_obj.sense_el.attrib['provenance'] = provenance_tag
+                    self.les_set_provenance(le_obj,provenance_tag)
+        
+    def les_set_provenance(self,le_obj,provenance_tag):
+        '''
+        set provenance of lexical entry and update the provenance counters
+        (see stats_snapshot)
+        
+        @type  le_obj: instance
+        @param le_obj: instance of class Le
+        
+        @type  provenance_tag: str
+        @param provenance_tag: provenance (sources concatenated by "+")
+        '''
+        self.stream_require_tree('les_set_provenance')
+        if self.batch_active():
+            self.batch_set(le_obj.le_el,'provenance',provenance_tag)
+            return
+        
+        le_el = le_obj.le_el
+        if le_el in self.synset_les.get(le_obj.get_synset_id(),[]):
+            self.stats_count_provenance(le_obj.get_provenance(),-1)
+            self.stats_count_provenance(provenance_tag,1)
+        
+        le_obj.sense_el.attrib['provenance'] = provenance_tag
+        self.generation['LexicalEntry'] += 1
+        self.validation_mark(le_el)
+    
+    def les_set_annotator(self,le_obj,annotator_tag):
+        '''
+        set annotator of lexical entry
+        
+        @type  le_obj: instance
+        @param le_obj: instance of class Le
+        
+        @type  annotator_tag: str
+        @param annotator_tag: annotators (concatenated by "+")
+        '''
+        self.stream_require_tree('les_set_annotator')
+        if self.batch_active():
+            self.batch_set(le_obj.le_el,'annotator',annotator_tag)
+            return
+        
+        le_obj.sense_el.attrib['annotator'] = annotator_tag
+        self.generation['LexicalEntry'] += 1
+        self.validation_mark(le_obj.le_el)
         
     def les_new_le_sense_id(self,short_pos):
         '''
@@ -5,9 +5,14 @@ class Relation():
     class for XML element Synset
 
     <SynsetRelation provenance="pwn" relType="has_hyperonym" target="eng-30-00322847-v"/>
+    
+    @type  parser: Wn_grid_parser
+    @param parser: [optional]. if provided, the indexes of the parser
+    are updated when the relation is removed
     '''
-    def __init__(self,relation_el): 
+    def __init__(self,relation_el,parser=None): 
         self.relation_el = relation_el
+        self.parser      = parser
     
     def get_provenance(self):
         '''
@@ -39,5 +44,16 @@ class Relation():
     def remove_me(self):
         '''
         remove relation element
+        (queued if the parser is in a batch, see Batch)
         '''
+        if self.parser is not None:
+            self.parser.stream_require_tree('Relation.remove_me')
+        
+        if self.parser is not None and self.parser.batch_active():
+            self.parser.batch_remove(self.relation_el)
+            return
+        
+        if self.parser is not None:
+            self.parser.synsets_unindex_relation(self.relation_el)
+        
         self.relation_el.getparent().remove(self.relation_el)
@@ -0,0 +1,397 @@
+import math
+
+class Similarity():
+    '''
+    synset similarity on the hypernym graph (see graph_hypernym_csr).
+
+    the measures follow their nltk definitions:
+    (1) path: 1 / (shortest path via a common hypernym + 1)
+    (2) Wu-Palmer: 2 * depth(lcs) / (depth(lcs) + d(s1,lcs) +
+                                     depth(lcs) + d(s2,lcs))
+    (3) Leacock-Chodorow: -log((shortest path + 1) / (2 * max depth of pos))
+
+    the lowest common subsumer (lcs) is the common hypernym with the
+    largest depth. the depth of a synset is the length of the longest
+    path to a synset without hypernyms (tops have depth 0).
+    Wu-Palmer counts the depth of the lcs from 1.
+
+    all methods take two sequences of synset identifiers and compare
+    them pairwise. the scores are returned as numpy arrays,
+    nan if one of the synsets does not exist or they have no common hypernym.
+
+    the IC based measures (Resnik, Lin, Jiang-Conrath) use the IC of the
+    synsets (see module ic.py) and are only defined for synsets with the
+    same pos.
+
+    the numpy module is needed.
+
+    >>> from wn_grid_parser import Wn_grid_parser
+    >>> instance = Wn_grid_parser("resources/test/odwn_test.xml.gz")
+    >>> def scores(measure,ids1,ids2):
+    ...     return [round(score,4) for score in measure(ids1,ids2).tolist()]
+
+    107 and 108 are hyponyms of 101 (depth 0), 102 has no hypernyms
+    >>> ids1 = ["eng-30-00000107-n"] * 4
+    >>> ids2 = ["eng-30-00000108-n","eng-30-00000101-n",
+    ...         "eng-30-00000107-n","eng-30-00000102-n"]
+    >>> instance.similarity_lcs(ids1,ids2)
+    ['eng-30-00000101-n', 'eng-30-00000101-n', 'eng-30-00000107-n', None]
+    >>> scores(instance.similarity_path,ids1,ids2)
+    [0.3333, 0.5, 1.0, nan]
+    >>> scores(instance.similarity_wup,ids1,ids2)
+    [0.5, 0.6667, 1.0, nan]
+    >>> scores(instance.similarity_lch,ids1,ids2)
+    [-0.4055, -0.0, 0.6931, nan]
+
+    with 102 as hypernym of 101, the depth of the lcs 101 is 1
+    and the largest noun depth is 2
+    >>> synset = instance.synsets_find_synset("eng-30-00000101-n")
+    >>> synset.add_relation("has_hyperonym","eng-30-00000102-n")
+    (True, '')
+    >>> scores(instance.similarity_wup,ids1[:1],ids2[:1])
+    [0.6667]
+    >>> scores(instance.similarity_lch,ids1[:1],ids2[:1])
+    [0.2877]
+    '''
+    def __init__(self):
+        pass
+
+    def similarity_depths(self):
+        '''
+        return the depth tables of the hypernym graph
+        (computed once per version of the synsets)
+
+        @rtype: dict
+        @return: 'min_depth' -> numpy array with shortest path to a top
+                 'max_depth' -> numpy array with longest path to a top
+                 'pos_max_depth' -> dict pos -> largest max_depth
+        '''
+        import numpy
+
+        graph_data = self.graph_get_data()
+        if 'depths' in graph_data:
+            return graph_data['depths']
+
+        (hyper_indptr,hyper_indices),(hypo_indptr,hypo_indices) = self.graph_hypernym_csr()
+        num_nodes = len(graph_data['ids'])
+
+        #min depth: breadth first from all tops at once
+        min_depth = numpy.full(num_nodes,-1,dtype=numpy.int64)
+        frontier  = numpy.flatnonzero(numpy.diff(hyper_indptr) == 0)
+        depth     = 0
+        while len(frontier):
+            min_depth[frontier] = depth
+            children = numpy.concatenate([hypo_indices[hypo_indptr[node]:hypo_indptr[node + 1]]
+                                          for node in frontier] or
+                                         [numpy.zeros(0,dtype=numpy.int64)])
+            children = numpy.unique(children)
+            frontier = children[min_depth[children] == -1]
+            depth   += 1
+
+        #max depth: longest path, in topological order from the tops
+        max_depth    = numpy.zeros(num_nodes,dtype=numpy.int64)
+        num_parents  = numpy.diff(hyper_indptr).copy()
+        ready        = list(numpy.flatnonzero(num_parents == 0))
+        while ready:
+            node = ready.pop()
+            for child in hypo_indices[hypo_indptr[node]:hypo_indptr[node + 1]].tolist():
+                if max_depth[node] + 1 > max_depth[child]:
+                    max_depth[child] = max_depth[node] + 1
+                num_parents[child] -= 1
+                if num_parents[child] == 0:
+                    ready.append(child)
+
+        #synsets in hypernym cycles are never ready: use their min depth
+        in_cycle = num_parents > 0
+        max_depth[in_cycle] = numpy.maximum(min_depth[in_cycle],0)
+
+        pos_max_depth = {}
+        for index,sy_id in enumerate(graph_data['ids']):
+            pos = sy_id[-1]
+            if max_depth[index] > pos_max_depth.get(pos,0):
+                pos_max_depth[pos] = int(max_depth[index])
+
+        graph_data['depths'] = {'min_depth'     : min_depth,
+                                'max_depth'     : max_depth,
+                                'pos_max_depth' : pos_max_depth}
+        return graph_data['depths']
+
+    def similarity_subsumers(self,index1,index2):
+        '''
+        return the shortest path between two synsets via a common hypernym
+        and their lowest common subsumer
+
+        @type  index1: int
+        @param index1: integer of synset (see graph_id2int)
+
+        @type  index2: int
+        @param index2: integer of synset (see graph_id2int)
+
+        @rtype: tuple
+        @return: (shortest path,lcs,distance index1 -> lcs,
+                  distance index2 -> lcs). all None if there is
+                  no common hypernym.
+        '''
+        max_depth = self.similarity_depths()['max_depth']
+
+        closure1 = self.graph_closure(index1)
+        closure2 = self.graph_closure(index2)
+        if len(closure2) < len(closure1):
+            closure1,closure2 = closure2,closure1
+            swapped = True
+        else:
+            swapped = False
+
+        shortest = None
+        lcs      = None
+        for ancestor,distance1 in closure1.items():
+            distance2 = closure2.get(ancestor)
+            if distance2 is None:
+                continue
+
+            if shortest is None or distance1 + distance2 < shortest:
+                shortest = distance1 + distance2
+
+            #deepest common hypernym, closest one if several are equally deep
+            key = (max_depth[ancestor],-(distance1 + distance2))
+            if lcs is None or key > lcs_key:
+                lcs,lcs_key,lcs_distance1,lcs_distance2 = ancestor,key,distance1,distance2
+
+        if lcs is None:
+            return (None,None,None,None)
+        if swapped:
+            lcs_distance1,lcs_distance2 = lcs_distance2,lcs_distance1
+
+        return (shortest,lcs,lcs_distance1,lcs_distance2)
+
+    def similarity_pairs(self,ids1,ids2):
+        '''
+        generator of subsumer information of synset pairs
+
+        @type  ids1: sequence
+        @param ids1: synset identifiers
+
+        @type  ids2: sequence
+        @param ids2: synset identifiers (same length as ids1)
+
+        @rtype: generator
+        @return: generator of (position,index1,index2,subsumers), see
+        similarity_subsumers. pairs with unknown synsets are skipped.
+        '''
+        if len(ids1) != len(ids2):
+            raise ValueError('ids1 and ids2 differ in length: %s %s' % (len(ids1),
+                                                                        len(ids2)))
+        id2int = self.graph_get_data()['id2int']
+
+        for position,(sy_id1,sy_id2) in enumerate(zip(ids1,ids2)):
+            index1 = id2int.get(sy_id1)
+            index2 = id2int.get(sy_id2)
+            if index1 is None or index2 is None:
+                continue
+
+            yield position,index1,index2,self.similarity_subsumers(index1,index2)
+
+    def similarity_lcs(self,ids1,ids2):
+        '''
+        return lowest common subsumers of pairs of synsets
+
+        @type  ids1: sequence
+        @param ids1: synset identifiers
+
+        @type  ids2: sequence
+        @param ids2: synset identifiers (same length as ids1)
+
+        @rtype: list
+        @return: list of synset identifiers (None if no common hypernym)
+        '''
+        ids    = self.graph_get_data()['ids']
+        result = [None] * len(ids1)
+        for position,index1,index2,(shortest,lcs,d1,d2) in self.similarity_pairs(ids1,ids2):
+            if lcs is not None:
+                result[position] = ids[lcs]
+
+        return result
+
+    def similarity_path(self,ids1,ids2):
+        '''
+        return path similarity of pairs of synsets
+
+        @type  ids1: sequence
+        @param ids1: synset identifiers
+
+        @type  ids2: sequence
+        @param ids2: synset identifiers (same length as ids1)
+
+        @rtype: numpy.ndarray
+        @return: scores (nan if no common hypernym)
+        '''
+        import numpy
+
+        result = numpy.full(len(ids1),numpy.nan)
+        for position,index1,index2,(shortest,lcs,d1,d2) in self.similarity_pairs(ids1,ids2):
+            if shortest is not None:
+                result[position] = 1.0 / (shortest + 1)
+
+        return result
+
+    def similarity_wup(self,ids1,ids2):
+        '''
+        return Wu-Palmer similarity of pairs of synsets
+
+        @type  ids1: sequence
+        @param ids1: synset identifiers
+
+        @type  ids2: sequence
+        @param ids2: synset identifiers (same length as ids1)
+
+        @rtype: numpy.ndarray
+        @return: scores (nan if no common hypernym)
+        '''
+        import numpy
+
+        max_depth = self.similarity_depths()['max_depth']
+        result    = numpy.full(len(ids1),numpy.nan)
+        for position,index1,index2,(shortest,lcs,d1,d2) in self.similarity_pairs(ids1,ids2):
+            if lcs is not None:
+                depth = max_depth[lcs] + 1
+                result[position] = 2.0 * depth / (d1 + depth + d2 + depth)
+
+        return result
+
+    def similarity_lch(self,ids1,ids2):
+        '''
+        return Leacock-Chodorow similarity of pairs of synsets
+        (only defined for synsets with the same pos)
+
+        @type  ids1: sequence
+        @param ids1: synset identifiers
+
+        @type  ids2: sequence
+        @param ids2: synset identifiers (same length as ids1)
+
+        @rtype: numpy.ndarray
+        @return: scores (nan if no common hypernym or different pos)
+        '''
+        import numpy
+
+        pos_max_depth = self.similarity_depths()['pos_max_depth']
+        result        = numpy.full(len(ids1),numpy.nan)
+        for position,index1,index2,(shortest,lcs,d1,d2) in self.similarity_pairs(ids1,ids2):
+            pos = ids1[position][-1]
+            if all([shortest is not None,
+                    pos == ids2[position][-1],
+                    pos_max_depth.get(pos,0) > 0]):
+                result[position] = -math.log((shortest + 1) /
+                                             (2.0 * pos_max_depth[pos]))
+
+        return result
+
+    def similarity_ic_pairs(self,ids1,ids2):
+        '''
+        generator of IC information of synset pairs (see ic_array).
+        pairs with unknown synsets or different pos are skipped.
+
+        @type  ids1: sequence
+        @param ids1: synset identifiers
+
+        @type  ids2: sequence
+        @param ids2: synset identifiers (same length as ids1)
+
+        @rtype: generator
+        @return: generator of (position,IC of synset 1,IC of synset 2,
+        IC of most informative common hypernym (None if there is none))
+        '''
+        if len(ids1) != len(ids2):
+            raise ValueError('ids1 and ids2 differ in length: %s %s' % (len(ids1),
+                                                                        len(ids2)))
+        id2int = self.graph_get_data()['id2int']
+        ic     = self.ic_array()
+
+        for position,(sy_id1,sy_id2) in enumerate(zip(ids1,ids2)):
+            index1 = id2int.get(sy_id1)
+            index2 = id2int.get(sy_id2)
+            if index1 is None or index2 is None or sy_id1[-1] != sy_id2[-1]:
+                continue
+
+            closure1 = self.graph_closure(index1)
+            closure2 = self.graph_closure(index2)
+            if len(closure2) < len(closure1):
+                closure1,closure2 = closure2,closure1
+
+            common = [ancestor for ancestor in closure1 if ancestor in closure2]
+            subsumer_ic = max(ic[common].tolist()) if common else None
+
+            yield position,float(ic[index1]),float(ic[index2]),subsumer_ic
+
+    def similarity_resnik(self,ids1,ids2):
+        '''
+        return Resnik similarity of pairs of synsets: the IC of
+        their most informative common hypernym
+
+        @type  ids1: sequence
+        @param ids1: synset identifiers
+
+        @type  ids2: sequence
+        @param ids2: synset identifiers (same length as ids1)
+
+        @rtype: numpy.ndarray
+        @return: scores (nan if no common hypernym or different pos)
+        '''
+        import numpy
+
+        result = numpy.full(len(ids1),numpy.nan)
+        for position,ic1,ic2,subsumer_ic in self.similarity_ic_pairs(ids1,ids2):
+            if subsumer_ic is not None:
+                result[position] = subsumer_ic
+
+        return result
+
+    def similarity_lin(self,ids1,ids2):
+        '''
+        return Lin similarity of pairs of synsets:
+        2 * resnik / (IC of synset 1 + IC of synset 2)
+
+        @type  ids1: sequence
+        @param ids1: synset identifiers
+
+        @type  ids2: sequence
+        @param ids2: synset identifiers (same length as ids1)
+
+        @rtype: numpy.ndarray
+        @return: scores (nan if no common hypernym or different pos)
+        '''
+        import numpy
+
+        result = numpy.full(len(ids1),numpy.nan)
+        for position,ic1,ic2,subsumer_ic in self.similarity_ic_pairs(ids1,ids2):
+            if subsumer_ic is not None and ic1 + ic2 > 0:
+                result[position] = 2.0 * subsumer_ic / (ic1 + ic2)
+
+        return result
+
+    def similarity_jcn(self,ids1,ids2):
+        '''
+        return Jiang-Conrath similarity of pairs of synsets:
+        1 / (IC of synset 1 + IC of synset 2 - 2 * resnik)
+
+        @type  ids1: sequence
+        @param ids1: synset identifiers
+
+        @type  ids2: sequence
+        @param ids2: synset identifiers (same length as ids1)
+
+        @rtype: numpy.ndarray
+        @return: scores (nan if no common hypernym or different pos,
+        inf if the distance is 0)
+        '''
+        import numpy
+
+        result = numpy.full(len(ids1),numpy.nan)
+        for position,ic1,ic2,subsumer_ic in self.similarity_ic_pairs(ids1,ids2):
+            if subsumer_ic is None:
+                continue
+
+            distance = ic1 + ic2 - 2 * subsumer_ic
+            result[position] = 1.0 / distance if distance > 0 else numpy.inf
+
+        return result
@@ -0,0 +1,200 @@
+import io
+import os
+import pickle
+import hashlib
+
+#import xml parser (lxml is preferred, else built-in module xml is used)
+try:
+    from lxml import etree
+except ImportError:
+    import xml.etree.ElementTree as etree
+
+class Snapshot():
+    '''
+    methods to store a parsed wn grid lmf file as a binary snapshot
+    next to the original .xml.gz file.
+
+    layout of a snapshot file:
+    (1) pickled header: dict with the version of the snapshot layout,
+    the sha1 hash and the mtime of the source file and the pickled
+    indexes (see class attribute index_attrs of Wn_grid_parser).
+    elements in the indexes are stored as their position in the document.
+    (2) the uncompressed document (without blank text)
+
+    >>> import os, gzip, pickle, shutil, tempfile
+    >>> from wn_grid_parser import Wn_grid_parser
+    >>> folder = tempfile.mkdtemp()
+    >>> path = os.path.join(folder,"odwn_test.xml.gz")
+    >>> path = shutil.copy("resources/test/odwn_test.xml.gz",path)
+
+    >>> parsed = Wn_grid_parser(path,snapshot=True)
+    >>> sorted(parsed.load_times), os.path.exists(parsed.snapshot_path())
+    (['index', 'parse'], True)
+    >>> loaded = Wn_grid_parser(path,snapshot=True)
+    >>> sorted(loaded.load_times)
+    ['snapshot']
+    >>> etree.tostring(loaded.doc) == etree.tostring(parsed.doc)
+    True
+    >>> all([getattr(loaded,attr) == getattr(parsed,attr)
+    ...      for attr in ['syn_ids','orbn_ids','reltypes','counts']])
+    True
+    >>> loaded.les_find_le("boom-n-2").get_synset_id()
+    'eng-30-00000101-n'
+    >>> loaded.les_find_le("boom-n-2").le_el.getparent() is loaded.lexicon_el
+    True
+
+    a changed source file is parsed again
+    >>> with gzip.open(path,'rb') as infile:
+    ...     data = infile.read()
+    >>> with gzip.open(path,'wb') as outfile:
+    ...     size = outfile.write(data.replace(b'"boom"',b'"bomen"'))
+    >>> changed = Wn_grid_parser(path,snapshot=True)
+    >>> sorted(changed.load_times)
+    ['index', 'parse']
+    >>> changed.les_find_le("boom-n-2").get_lemma()
+    'bomen'
+    >>> Wn_grid_parser(path,snapshot=True).les_find_le("boom-n-2").get_lemma()
+    'bomen'
+
+    a corrupt snapshot is ignored and written again
+    >>> with open(parsed.snapshot_path(),'r+b') as outfile:
+    ...     size = outfile.seek(-200,os.SEEK_END)
+    ...     size = outfile.truncate()
+    >>> corrupt = Wn_grid_parser(path,snapshot=True)
+    >>> sorted(corrupt.load_times)
+    ['index', 'parse']
+    >>> with open(parsed.snapshot_path(),'wb') as outfile:
+    ...     pickle.dump(['not','a','header'],outfile)
+    >>> sorted(Wn_grid_parser(path,snapshot=True).load_times)
+    ['index', 'parse']
+    >>> sorted(Wn_grid_parser(path,snapshot=True).load_times)
+    ['snapshot']
+    >>> shutil.rmtree(folder)
+    '''
+    snapshot_version = 5
+
+    def __init__(self):
+        pass
+
+    def snapshot_path(self):
+        '''
+        return path to snapshot of ivar path_wn_grid_lmf
+
+        @rtype: str
+        @return: path to snapshot (for example
+        odwn_orbn_gwg-LMF_1.3.xml.gz.snapshot.bin)
+        '''
+        return self.path_wn_grid_lmf + '.snapshot.bin'
+
+    def snapshot_key(self):
+        '''
+        return the key a snapshot is valid for
+
+        @rtype: tuple
+        @return: (sha1 hash of ivar path_wn_grid_lmf,
+                  mtime of ivar path_wn_grid_lmf)
+        '''
+        sha1 = hashlib.sha1()
+        with open(self.path_wn_grid_lmf,'rb') as infile:
+            for chunk in iter(lambda: infile.read(1024 * 1024), b''):
+                sha1.update(chunk)
+
+        return (sha1.hexdigest(),os.path.getmtime(self.path_wn_grid_lmf))
+
+    def snapshot_load(self):
+        '''
+        load ivar doc, ivar lexicon_el and the indexes from the snapshot.
+        nothing is loaded if there is no snapshot, if it was created
+        from another version of the source file or if it is corrupt.
+
+        @rtype: bool
+        @return: True if the snapshot was loaded, else False
+        '''
+        path = self.snapshot_path()
+        if not os.path.exists(path):
+            return False
+
+        with open(path,'rb') as infile:
+            #a corrupt header can raise almost any error while unpickling
+            try:
+                header = pickle.load(infile)
+            except Exception:
+                return False
+
+            if not isinstance(header,dict):
+                return False
+
+            if any([header.get('version') != self.snapshot_version,
+                    header.get('key') != self.snapshot_key()]):
+                return False
+
+            #the document directly follows the header
+            try:
+                doc = etree.parse(infile)
+            except etree.XMLSyntaxError:
+                return False
+
+        lexicon_el = doc.find("Lexicon")
+        if lexicon_el is None:
+            return False
+        children = list(lexicon_el)
+
+        def persistent_load(position):
+            element = children[position[0]]
+            for index in position[1:]:
+                element = element[index]
+            return element
+
+        unpickler = pickle.Unpickler(io.BytesIO(header.get('indexes',b'')))
+        unpickler.persistent_load = persistent_load
+        try:
+            indexes = unpickler.load()
+        except Exception:
+            return False
+
+        self.doc        = doc
+        self.lexicon_el = lexicon_el
+        for attr,value in indexes.items():
+            setattr(self,attr,value)
+
+        return True
+
+    def snapshot_write(self):
+        '''
+        write snapshot of ivar doc and the indexes.
+        the snapshot is first written to a temporary file, which then
+        replaces an existing snapshot.
+        '''
+        path      = self.snapshot_path()
+        tmp_path  = path + '.tmp'
+        positions = {child_el: position
+                     for position,child_el in enumerate(self.lexicon_el)}
+
+        def persistent_id(obj):
+            if not etree.iselement(obj):
+                return None
+
+            position = []
+            while obj not in positions:
+                parent_el = obj.getparent()
+                position.insert(0,parent_el.index(obj))
+                obj = parent_el
+            position.insert(0,positions[obj])
+            return tuple(position)
+
+        indexes = io.BytesIO()
+        pickler = pickle.Pickler(indexes,pickle.HIGHEST_PROTOCOL)
+        pickler.persistent_id = persistent_id
+        pickler.dump({attr: getattr(self,attr) for attr in self.index_attrs})
+
+        header = {'version' : self.snapshot_version,
+                  'key'     : self.snapshot_key(),
+                  'indexes' : indexes.getvalue()}
+
+        with open(tmp_path,'wb') as outfile:
+            pickle.dump(header,outfile,pickle.HIGHEST_PROTOCOL)
+            self.doc.write(outfile,
+                           xml_declaration=True,
+                           encoding='utf-8')
+
+        os.replace(tmp_path,path)
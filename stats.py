@@ -4,13 +4,281 @@ import random
 import os
 import pickle
 
+from accumulators import (LeRecord, SynsetRecord, NumLes, EmptyLemmas,
+                          Provenance, Polysemy, EmptySynsets, LargeSynsets,
+                          Rels, Tops, NoGloss, PosCounts,
+                          BidirectionalRelations, NoRels, Contradicting)
+
 class Stats():
     '''
     generate stats about resources
+    
+    the stats are computed by accumulators (see module accumulators.py),
+    which are all fed by one pass over the children of the Lexicon
+    element (see stats_run). class attribute stats_accumulators lists the
+    accumulators computed by stats_compute.
     '''
+    stats_accumulators = [NumLes,
+                          EmptyLemmas,
+                          Provenance,
+                          Polysemy,
+                          EmptySynsets,
+                          LargeSynsets,
+                          Rels,
+                          Tops,
+                          NoGloss,
+                          PosCounts,
+                          BidirectionalRelations,
+                          NoRels,
+                          Contradicting]
+    
     def __init__(self):  
         pass 
     
+    def stats_run(self,accumulators):
+        '''
+        feed the LexicalEntry and Synset children of the Lexicon element
+        to accumulators (multi-words are ignored, as in les_get_generator).
+        the document is traversed once.
+        
+        @type  accumulators: list
+        @param accumulators: list of instances of accumulators.Accumulator
+        
+        @rtype: list
+        @return: list of results (one per accumulator)
+        '''
+        le_visitors     = [accumulator.visit_le for accumulator in accumulators
+                           if 'LexicalEntry' in accumulator.tags]
+        synset_visitors = [accumulator.visit_synset for accumulator in accumulators
+                           if 'Synset' in accumulator.tags]
+        
+        tags = []
+        if le_visitors:
+            tags.append('LexicalEntry')
+        if synset_visitors:
+            tags.append('Synset')
+        
+        if tags:
+            if self.mode == "stream":
+                children = self.stream_iter(*tags)
+            else:
+                children = self.lexicon_el.iterchildren(*tags)
+            
+            for child_el in children:
+                if child_el.tag == 'LexicalEntry':
+                    if "mwe" in child_el.get("id"):
+                        continue
+                    
+                    le = LeRecord(child_el)
+                    for visit in le_visitors:
+                        visit(le)
+                
+                else:
+                    synset = SynsetRecord(child_el)
+                    for visit in synset_visitors:
+                        visit(synset)
+        
+        return [accumulator.result() for accumulator in accumulators]
+    
+    def stats_compute(self,names=None):
+        '''
+        compute stats of class attribute stats_accumulators in one pass.
+        
+        results are cached in ivar stats_cache together with the
+        generation (see ivar generation) of the tags the accumulator
+        depends on (class attribute tags of the accumulator).
+        only accumulators of which a tag was modified since they were
+        computed are computed again. cached results should not be modified.
+        
+        @type  names: list
+        @param names: [optional]. names of the accumulators to compute
+        (for example ['tops','no_rels']). Default is None,
+        then all accumulators are computed.
+        
+        @rtype: dict
+        @return: mapping from accumulator name -> result
+        '''
+        results      = {}
+        accumulators = []
+        generations  = []
+        
+        for accumulator_class in self.stats_accumulators:
+            if names is not None and accumulator_class.name not in names:
+                continue
+            
+            generation = tuple(self.generation[tag] for tag in accumulator_class.tags)
+            cached     = self.stats_cache.get(accumulator_class.name)
+            if cached is not None and cached[0] == generation:
+                results[accumulator_class.name] = cached[1]
+            else:
+                accumulators.append(accumulator_class(self))
+                generations.append(generation)
+        
+        for accumulator,generation,result in zip(accumulators,
+                                                 generations,
+                                                 self.stats_run(accumulators)):
+            self.stats_cache[accumulator.name] = (generation,result)
+            results[accumulator.name] = result
+        
+        return results
+    
+    def stats_reset_counts(self):
+        '''
+        reset ivar counts, the live counters that are updated by the
+        index hooks (see stats_snapshot). 'lemmas' maps lemma -> number of
+        lexical entries (see stats_count_polysemy)
+        '''
+        self.counts = {'num_les'           : 0,
+                       'num_relations'     : 0,
+                       'num_empty_synsets' : 0,
+                       'pos'               : defaultdict(int),
+                       'provenance'        : defaultdict(int),
+                       'polysemy'          : defaultdict(int),
+                       'lemmas'            : {}}
+    
+    def stats_count_provenance(self,provenance_tag,delta):
+        '''
+        update the provenance counters (as in resources_check)
+        
+        @type  provenance_tag: str
+        @param provenance_tag: value of attribute "provenance" of a
+        Sense element (None if not present)
+        
+        @type  delta: int
+        @param delta: 1 | -1
+        '''
+        provenance = self.counts['provenance']
+        resources  = ['None'] if provenance_tag is None else provenance_tag.split("+")
+        for resource in resources:
+            provenance[resource] += delta
+            if not provenance[resource]:
+                del provenance[resource]
+    
+    def stats_count_polysemy(self,lemma,delta):
+        '''
+        update the polysemy histogram for a lemma that gains (delta 1)
+        or loses (delta -1) a lexical entry. the number of lexical entries
+        per lemma is kept in ivar counts['lemmas'].
+        
+        @type  lemma: str
+        @param lemma: lemma
+        
+        @type  delta: int
+        @param delta: 1 | -1
+        '''
+        polysemy = self.counts['polysemy']
+        lemmas   = self.counts['lemmas']
+        num_les  = lemmas.get(lemma,0)
+        
+        for value,change in [(num_les,-1),(num_les + delta,1)]:
+            if value:
+                polysemy[value] += change
+                if not polysemy[value]:
+                    del polysemy[value]
+        
+        if num_les + delta:
+            lemmas[lemma] = num_les + delta
+        else:
+            del lemmas[lemma]
+    
+    def stats_index_le(self,le):
+        '''
+        update ivar counts for a LexicalEntry element that is indexed
+        (called before the other index methods)
+        
+        @type  le: accumulators.LeRecord
+        @param le: values of LexicalEntry element
+        '''
+        if "mwe" in le.le_id:
+            return
+        
+        self.counts['num_les'] += 1
+        self.stats_count_provenance(le.provenance,1)
+        self.stats_count_polysemy(le.lemma,1)
+        
+        if le.synset in self.syn_ids and not self.synset_les.get(le.synset):
+            self.counts['num_empty_synsets'] -= 1
+    
+    def stats_unindex_le(self,le):
+        '''
+        update ivar counts for a LexicalEntry element that is unindexed
+        (called before the other unindex methods)
+        
+        @type  le: accumulators.LeRecord
+        @param le: values of LexicalEntry element
+        '''
+        synset_les = self.synset_les.get(le.synset,[])
+        if le.le_el not in synset_les:
+            return
+        
+        self.counts['num_les'] -= 1
+        self.stats_count_provenance(le.provenance,-1)
+        self.stats_count_polysemy(le.lemma,-1)
+        
+        if le.synset in self.syn_ids and len(synset_les) == 1:
+            self.counts['num_empty_synsets'] += 1
+    
+    def stats_index_synset(self,synset):
+        '''
+        update ivar counts for a Synset element that is indexed
+        (called before the other index methods)
+        
+        @type  synset: accumulators.SynsetRecord
+        @param synset: values of Synset element
+        '''
+        sy_id = synset.sy_id
+        if sy_id in self.syn_ids:
+            return
+        
+        self.counts['pos'][sy_id[-1]] += 1
+        if not self.synset_les.get(sy_id):
+            self.counts['num_empty_synsets'] += 1
+    
+    def stats_unindex_synset(self,synset):
+        '''
+        update ivar counts for a Synset element that is unindexed
+        (called before the other unindex methods)
+        
+        @type  synset: accumulators.SynsetRecord
+        @param synset: values of Synset element
+        '''
+        sy_id = synset.sy_id
+        if self.synset_els.get(sy_id) is not synset.synset_el:
+            return
+        
+        pos = self.counts['pos']
+        pos[sy_id[-1]] -= 1
+        if not pos[sy_id[-1]]:
+            del pos[sy_id[-1]]
+        if not self.synset_les.get(sy_id):
+            self.counts['num_empty_synsets'] -= 1
+    
+    def stats_snapshot(self):
+        '''
+        return the current values of the live counters
+        (no pass over the document)
+        
+        @rtype: dict
+        @return: mapping with the keys 'num_synsets','num_lexical_entries',
+        'num_relations','num_empty_synsets','pos_counts' (as in count_pos),
+        'provenance' (as in resources_check), 'polysemy_histogram'
+        (polysemy -> number of lemmas) and 'average_polysemy'
+        '''
+        polysemy    = dict(self.counts['polysemy'])
+        num_lemmas  = sum(polysemy.values())
+        average_polysemy = None
+        if num_lemmas:
+            average_polysemy = round(self.counts['num_les']/num_lemmas,1)
+        
+        return {'num_synsets'         : len(self.syn_ids),
+                'num_lexical_entries' : self.counts['num_les'],
+                'num_relations'       : self.counts['num_relations'],
+                'num_empty_synsets'   : self.counts['num_empty_synsets'],
+                'pos_counts'          : sorted(self.counts['pos'].items()),
+                'provenance'          : sorted(self.counts['provenance'].items()),
+                'polysemy_histogram'  : polysemy,
+                'average_polysemy'    : average_polysemy}
+    
     def stats_num_synsets(self):
         '''
         return number of synsets (length of self.syn_ids)
@@ -27,11 +295,7 @@ class Stats():
         @rtype: int
         @return: number of lexical entries
         '''
-        num_les = 0 
-        for le_el in self.les_get_generator():
-            num_les += 1
-        
-        return num_les
+        return self.stats_compute([NumLes.name])[NumLes.name]
     
     def stats_rels(self):
         '''
@@ -40,28 +304,20 @@ class Stats():
         @rtype: int
         @return: number of synset relations
         '''
-        num_rels     = 0
-        impossible   = []
-        
-        for sy_obj in self.synsets_get_generator():
-            existing = []
-            
-            for rel_obj in sy_obj.get_all_relations():
-                num_rels +=1 
-                
-                source   = sy_obj.get_id()
-                reltype  = rel_obj.get_reltype() 
-                target   = rel_obj.get_target()
-                succes,message = self.validate_relation(source,reltype,target)
-                if succes:
-                    if (source,reltype,target) in existing:
-                        impossible.append(rel_obj)
-                    else:
-                        existing.append((source,reltype,target))
-                else:
-                    impossible.append(rel_obj)
+        rels = self.stats_compute([Rels.name])[Rels.name]
+        return rels['num_rels'],rels['impossible']
+    
+    def stats_relation_integrity(self):
+        '''
+        return impossible relations by failure reason (see
+        validate_relation): target_missing | source_missing | cross_pos |
+        source_is_target | unknown_reltype | duplicate
         
-        return num_rels,impossible
+        @rtype: dict
+        @return: mapping from failure reason -> list of instances of
+        class Relation
+        '''
+        return self.stats_compute([Rels.name])[Rels.name]['by_reason']
     
     def empty_lemmas(self):
         '''
@@ -70,14 +326,7 @@ class Stats():
         @rtype: int
         @return: number of synonym with an empty lemma
         '''
-        empty_lemmas = 0
-        
-        for le_obj in self.les_get_generator():
-            lemma = le_obj.get_lemma()
-            if not lemma:
-                empty_lemmas += 1
-        
-        return empty_lemmas
+        return self.stats_compute([EmptyLemmas.name])[EmptyLemmas.name]
     
     def tops(self):
         '''
@@ -86,13 +335,7 @@ class Stats():
         @rtype: int
         @return: number of synsets without hypernyms
         '''
-        tops = []
-        for sy_obj in self.synsets_get_generator():
-            hyperonyms = sy_obj.get_relations('has_hyperonym')
-            if not hyperonyms:
-                tops.append(sy_obj.get_id())
-        
-        return tops
+        return self.stats_compute([Tops.name])[Tops.name]
 
     def stats_empty_synsets(self):
         '''
@@ -107,40 +350,30 @@ class Stats():
                   num_empty_pwn_synsets,
                   empty_odwn_leave_synsets)
         '''
-        non_empty_synsets = set()
+        empty_synsets = self.stats_compute([EmptySynsets.name])[EmptySynsets.name]
+        return self.stats_store_empty_synsets(empty_synsets)
 
-        for le_obj in self.les_get_generator():
-            target = le_obj.get_synset_id()
-            non_empty_synsets.update([target])
-        
-        empty_synsets = set(self.syn_ids.keys()) - non_empty_synsets
+    def stats_store_empty_synsets(self,empty_synsets):
+        '''
+        store the empty pwn synsets and the pwn leave synsets in
+        resources/empty_pwn_synsets.bin and resources/leave_pwn_synsets.bin
         
-        empty_odwn_synsets = [sy_id for sy_id in empty_synsets if sy_id.startswith("odwn")]
-        empty_pwn_synsets  = [sy_id for sy_id in empty_synsets if sy_id.startswith("eng")]
+        @type  empty_synsets: dict
+        @param empty_synsets: result of accumulators.EmptySynsets
         
-        leave_empty_odwn_synsets = set() 
-        leave_pwn_synsets = set()
-
-        for sy_obj in self.synsets_get_generator():
-            sy_id    = sy_obj.get_id()
-            hyponyms = sy_obj.get_relations('has_hyponym')
-            if not hyponyms:
-                if sy_id in empty_odwn_synsets:
-                    leave_empty_odwn_synsets.add(sy_id)
-                if sy_id.startswith('eng-30'):
-                    leave_pwn_synsets.add(sy_id)
-
-
+        @rtype: dict
+        @return: see stats_empty_synsets
+        '''
         with open( os.path.join(self.cwd,'resources','leave_pwn_synsets.bin'),'wb') as outfile:
-            pickle.dump(leave_pwn_synsets,outfile)
+            pickle.dump(empty_synsets['leave_pwn_synsets'],outfile)
 
         with open( os.path.join(self.cwd,'resources','empty_pwn_synsets.bin'),'wb') as outfile:
-            pickle.dump(empty_pwn_synsets,outfile)
+            pickle.dump(empty_synsets['empty_pwn_synsets'],outfile)
 
-        return  { 'num_empty_synsets'       : len(empty_synsets),
-                  'num_empty_odwn_synsets'  : len(empty_odwn_synsets),
-                  'num_empty_pwn_synsets'   : len(empty_pwn_synsets),
-                  'leave_empty_odwn_synsets' : leave_empty_odwn_synsets}
+        return  { 'num_empty_synsets'       : empty_synsets['num_empty_synsets'],
+                  'num_empty_odwn_synsets'  : empty_synsets['num_empty_odwn_synsets'],
+                  'num_empty_pwn_synsets'   : empty_synsets['num_empty_pwn_synsets'],
+                  'leave_empty_odwn_synsets' : empty_synsets['leave_empty_odwn_synsets']}
 
     def no_gloss(self):
         '''
@@ -151,27 +384,7 @@ class Stats():
         @rtype: tuple
         @return: sy_no_gloss,empty_glosses,one_word
         '''
-        sy_no_gloss   = 0
-        empty_glosses = 0
-        one_word      = 0
-         
-        for sy_obj in self.synsets_get_generator():
-            
-            glosses = sy_obj.get_glosses()
-            
-            if not glosses:
-                sy_no_gloss += 1
-            
-            for gloss in glosses:
-                if not gloss:
-                    empty_glosses += 1
-                
-                split = gloss.split()
-                if len(split) == 1:
-                    one_word += 1
-                    
-        
-        return sy_no_gloss,empty_glosses,one_word
+        return self.stats_compute([NoGloss.name])[NoGloss.name]
         
         
     def count_pos(self):
@@ -181,14 +394,7 @@ class Stats():
         @rtype: tuple
         @return: list of tuples (pos,count)
         '''
-        pos = defaultdict(int)
-        
-        for sy_obj in self.synsets_get_generator():
-            
-            part_of_speech = sy_obj.get_pos()
-            pos[part_of_speech] += 1
-        
-        return [(key,value) for key,value in sorted(pos.items())]
+        return self.stats_compute([PosCounts.name])[PosCounts.name]
     
     
     def resources_check(self):
@@ -198,21 +404,7 @@ class Stats():
         @rtype: dict
         @return: list of tuples (resource,count)
         '''
-        resources_dict = defaultdict(int)
-        
-        for le_el in self.les_get_generator():
-            
-            resource_tag = le_el.get_provenance()
-            
-            if resource_tag is None:
-                resources_dict['None'] += 1
-            
-            else:
-                resources = resource_tag.split("+")
-                for resource in resources:
-                    resources_dict[resource] += 1
-        
-        return  [(key,value) for key,value in sorted(resources_dict.items())]
+        return self.stats_compute([Provenance.name])[Provenance.name]
             
 
     def missing_bidirectional_relations(self,rel1,rel2):
@@ -230,35 +422,7 @@ class Stats():
         @rtype: list
         @return: list of 3-tuples (source synset, target synset, relation)
         '''
-        rels = {}
-        
-        for sy_obj in self.synsets_get_generator():
-            source_synset = sy_obj.get_id()
-            
-            for rel_el in sy_obj.get_all_relations():
-                reltype = rel_el.get_reltype()
-                
-                if reltype in [rel1,rel2]:
-                    target_synset = rel_el.get_target()
-                    rel  = (source_synset,target_synset,reltype)
-                    key  = tuple(sorted([source_synset,target_synset]))
-                    if key not in rels:
-                        rels[key] = defaultdict(list)
-                    rels[key]['reltypes'].append(reltype)
-                    rels[key]['rels'].append(rel)
-        
-        rels_to_add = []
-        goal        = set([rel1,rel2])
-        for value in rels.values():
-            if  set(value['reltypes']) != goal:
-                
-                source,target,reltype = value['rels'][0]
-                miss_reltypes = goal.difference(set(value['reltypes']))
-                for rel_to_add in miss_reltypes: 
-                    rels_to_add.append((target,source,rel_to_add))
-        
-        
-        return rels_to_add
+        return self.stats_run([BidirectionalRelations(self,rel1,rel2)])[0]
         
     
     def polysemy_dict(self):
@@ -269,19 +433,7 @@ class Stats():
         @rtype: dict
         @return: mapping polysemy to list of lemmas
         '''
-        polysemy_dict = defaultdict(list)
-        
-        for lemma,polysemy in self.lemmas_generator().items():
-            polysemy_dict[polysemy].append(lemma)
-        
-        total    = 0.0
-        instance = 0.0
-        for polysemy,list_lemmas in polysemy_dict.items():
-            total    += (polysemy * len(list_lemmas))
-            instance += len(list_lemmas)
-        average_polysemy = round(total/instance,1)
-
-        return average_polysemy,polysemy_dict
+        return self.stats_compute([Polysemy.name])[Polysemy.name]
              
             
             
@@ -293,15 +445,7 @@ class Stats():
         @rtype: set
         @return: set of synset identifiers
         '''
-        no_rels = set()
-        
-        for sy_obj in self.synsets_get_generator():
-            
-            if not any([sy_obj.get_relations("has_hyponym"),
-                        sy_obj.get_relations("has_hyperonym")]):
-                no_rels.update([sy_obj.get_id()])
-        
-        return no_rels
+        return self.stats_compute([NoRels.name])[NoRels.name]
     
     def contradicting_rels(self):
         '''
@@ -311,57 +455,25 @@ class Stats():
         @rtype: dict
         @return: mapping (source,target) -> list of rel_obj
         '''
-        contradicting = defaultdict(list)
-        
-        for sy_obj in self.synsets_get_generator():
-            source = sy_obj.get_id()
-            
-            for rel_obj in sy_obj.get_all_relations():
-                
-                reltype = rel_obj.get_reltype()
-                target  = rel_obj.get_target()
-                contradicting[(source,target)].append(reltype)
-                
-        keys_to_remove = [key 
-                          for key,value in contradicting.items()
-                          if len(value) <= 1]
-        
-        for key in keys_to_remove:
-            del contradicting[key]
-        
-        return contradicting
+        return self.stats_compute([Contradicting.name])[Contradicting.name]
                 
     def stats_large_synsets(self):
         '''
         creates a dict mapping synset identifier to
         find large synsets
         '''
-        freq = {}
-
-        for le_obj in self.les_get_generator():
-            target = le_obj.get_synset_id()
-            annotated = le_obj.get_annotator() != ''
-            if target in freq:
-                freq[target]['polysemy'] += 1
-                if not annotated:
-                    freq[target]['annotated'] = annotated
-            else:
-                freq[target] = {'polysemy' : 1,
-                                'annotated': annotated}
+        large_synsets = self.stats_compute([LargeSynsets.name])[LargeSynsets.name]
+        self.stats_store_large_synsets(large_synsets)
 
-        minimum = 5
-        maximum = 10
-        min_max = range(minimum,maximum)
-        large_synsets = []
-        for key,value in freq.items():
-            if all([value['polysemy'] in min_max,
-                    not value['annotated'],
-                    key not in large_synsets]):
-                large_synsets.append(key)
-        
-        #print(len(large_synsets))
-        
-        with open( os.path.join(self.cwd,'resources','synsets_%s_%s.bin' % (minimum,maximum)),'wb') as outfile:
+    def stats_store_large_synsets(self,large_synsets):
+        '''
+        store large synsets in resources/synsets_5_10.bin
+        
+        @type  large_synsets: list
+        @param large_synsets: result of accumulators.LargeSynsets
+        '''
+        with open( os.path.join(self.cwd,'resources','synsets_%s_%s.bin' % (LargeSynsets.minimum,
+                                                                              LargeSynsets.maximum)),'wb') as outfile:
             pickle.dump(large_synsets,outfile)
 
 
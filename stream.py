@@ -0,0 +1,102 @@
+import gzip
+
+#import xml parser (lxml is preferred, else built-in module xml is used)
+try:
+    from lxml import etree
+except ImportError:
+    import xml.etree.ElementTree as etree
+
+class Stream():
+    '''
+    read-only access to a wn grid lmf file without keeping the document
+    in memory (Wn_grid_parser(path,mode="stream")).
+
+    the file is parsed incrementally each time the children of the
+    Lexicon element are iterated (see stream_iter). every child is
+    cleared after it has been processed, so memory use does not grow
+    with the size of the file. only the synset identifiers and the
+    relation types are kept (ivar syn_ids and ivar reltypes, see
+    stream_index).
+
+    in stream mode, les_get_generator, synsets_get_generator and the
+    stats (stats_compute, get_stats) are available. the yielded instances
+    are only valid until the next one is yielded.
+    methods that need the indexes or ivar doc (lookups, editing, export,
+    validation) are not available, they raise a ValueError
+    (see stream_require_tree). this also holds for the methods of the
+    yielded instances that edit the document (remove_me, add_relation).
+
+    >>> from wn_grid_parser import Wn_grid_parser
+    >>> streamer = Wn_grid_parser("resources/test/odwn_test.xml.gz",mode="stream")
+    >>> len(list(streamer.les_get_generator()))
+    12
+    >>> le_obj = next(streamer.les_get_generator())
+    >>> le_obj.remove_me()
+    Traceback (most recent call last):
+    ...
+    ValueError: Le.remove_me is not available in stream mode, use Wn_grid_parser(path,mode="tree")
+    >>> sy_obj = next(streamer.synsets_get_generator())
+    >>> sy_obj.add_relation("has_hyperonym","eng-30-00000101-n")
+    Traceback (most recent call last):
+    ...
+    ValueError: Synset.add_relation is not available in stream mode, use Wn_grid_parser(path,mode="tree")
+    '''
+    def __init__(self):
+        pass
+
+    def stream_require_tree(self,name):
+        '''
+        raise ValueError if the parser is in stream mode.
+        called at the start of methods that need ivar doc or the indexes.
+
+        @type  name: str
+        @param name: name of the method
+
+        @raise ValueError: if ivar mode is "stream"
+        '''
+        if self.mode == "stream":
+            raise ValueError('%s is not available in stream mode, '
+                             'use Wn_grid_parser(path,mode="tree")' % name)
+
+    def stream_iter(self,*tags):
+        '''
+        parse ivar path_wn_grid_lmf incrementally and yield the children
+        of the Lexicon element with one of the tags (in document order).
+        a child is cleared (and removed from the Lexicon element)
+        when the next one is requested.
+
+        @type  tags: str
+        @param tags: LexicalEntry | Synset
+
+        @rtype: generator
+        @return: generator of LexicalEntry and/or Synset elements
+        '''
+        #children with other tags are parsed as well, so that they
+        #can be cleared (lexical entries precede the synsets)
+        with gzip.GzipFile(self.path_wn_grid_lmf) as infile:
+            for event,child_el in etree.iterparse(infile,
+                                                  events=('end',),
+                                                  tag=('LexicalEntry','Synset'),
+                                                  remove_blank_text=True):
+                if child_el.getparent().tag != 'Lexicon':
+                    continue
+
+                if child_el.tag in tags:
+                    yield child_el
+
+                child_el.clear()
+                while child_el.getprevious() is not None:
+                    del child_el.getparent()[0]
+
+    def stream_index(self):
+        '''
+        set ivar syn_ids and ivar reltypes in one pass over the Synset
+        elements (the stats need them)
+        '''
+        self.syn_ids  = {}
+        self.reltypes = {}
+
+        for synset_el in self.stream_iter('Synset'):
+            self.syn_ids[synset_el.get("id")] = 0
+            for relation_el in synset_el.iterfind("SynsetRelations/SynsetRelation"):
+                self.reltypes[relation_el.get("relType")] = ""
@@ -18,12 +18,17 @@ class Synset():
         <SynsetRelation provenance="pwn" relType="has_hyponym" target="eng-30-00325085-v"/>
     </SynsetRelations>
     </Synset>
+    
+    @type  parser: Wn_grid_parser
+    @param parser: parser of the synset. relations are validated by the
+    parser and its indexes are updated when the synset is modified
     '''
-    def __init__(self,synset_el,reltypes,syn_ids):
+    def __init__(self,synset_el,reltypes,syn_ids,parser):
         
         self.synset_el  = synset_el
         self.reltypes   = reltypes
         self.syn_ids    = syn_ids
+        self.parser     = parser
         
         self.defs_els   = self.synset_el.find("Definitions")
         self.refs_el    = self.synset_el.find("SynsetRelations")
@@ -71,7 +76,7 @@ class Synset():
         '''
         path_to_rels="SynsetRelations/SynsetRelation"
         for relation_el in self.synset_el.iterfind(path_to_rels):
-            yield Relation(relation_el)
+            yield Relation(relation_el,self.parser)
     
     def get_pos(self):
         '''
@@ -94,14 +99,21 @@ class Synset():
         @return: list of instances of class Relation
         '''
         xml_query='''SynsetRelations/SynsetRelation[@relType="%s"]''' % reltype
-        return [Relation(relation_el)
+        return [Relation(relation_el,self.parser)
                 for relation_el in self.synset_el.iterfind(xml_query)]
     
     def remove_me(self):
         '''
         remove synset element
+        (queued if the parser is in a batch, see Batch)
         '''
+        self.parser.stream_require_tree('Synset.remove_me')
+        if self.parser.batch_active():
+            self.parser.batch_remove(self.synset_el)
+            return
+        
         self.synset_el.getparent().remove(self.synset_el)
+        self.parser.unindex_element(self.synset_el)
     
 
     def add_relation(self,reltype,target):
@@ -119,33 +131,72 @@ class Synset():
         @return: (succes, message)
         
         '''
-        source = self.get_id()
-        succes,message = self.validate_relation(source,reltype,target)
-        
-        if not succes:
-            return (succes,message)
-        
-        existing_rels = [(rel_el.get_reltype(),rel_el.get_target())
-                         for rel_el in self.get_all_relations()]
-        
-        if (reltype,target) in existing_rels:
-            return (False,"relation already exists") 
-
-        
-        #add SynsetRelations element if it does not exists
-        if self.refs_el is None:
-            new_refs_el = etree.SubElement(self.synset_el, "SynsetRelations")
-            self.synset_el.append(new_refs_el)
+        self.parser.stream_require_tree('Synset.add_relation')
+        return self.add_relations([(reltype,target)])[0]
+    
+    def add_relations(self,rels):
+        '''
+        add SynsetRelation elements. the existing relations are
+        collected once for all new relations.
+        relations of an existing synset are queued if the parser
+        is in a batch (see Batch).
         
-        #add SynsetRelations element
-        new_rel_el = etree.SubElement(self.synset_el, 
-                                      "SynsetRelation",
-                                      {'provenance':  'odwn',
-                                       'relType'   :  reltype,
-                                       'target'    :  target})
-        self.refs_el.append(new_rel_el)
+        @type  rels: list
+        @param rels: list of tuples (reltype,target)
         
-        return (True,"")
+        @rtype: list
+        @return: list of tuples (succes, message), one per relation
+        '''
+        self.parser.stream_require_tree('Synset.add_relations')
+        source     = self.get_id()
+        new_source = source not in self.syn_ids
+        results    = []
+        
+        if not new_source and self.parser.batch_active():
+            return self.parser.batch_add_relations(self.synset_el,rels)
+        
+        existing_rels = {(relation_el.get("relType"),relation_el.get("target"))
+                         for relation_el in self.synset_el.iterfind("SynsetRelations/SynsetRelation")}
+        
+        for reltype,target in rels:
+            
+            #synsets that are being added (see synsets_add_synset)
+            #are not yet in the synset index
+            succes,message = self.parser.validate_relation(source,reltype,target,
+                                                           new_source=new_source)
+            
+            if not succes:
+                results.append((succes,message))
+                continue
+            
+            if (reltype,target) in existing_rels:
+                results.append((False,"relation already exists"))
+                continue
+            
+            #add SynsetRelations element if it does not exists
+            if self.refs_el is None:
+                self.refs_el = etree.Element("SynsetRelations")
+                if self.defs_els is not None:
+                    self.defs_els.addnext(self.refs_el)
+                else:
+                    self.synset_el.insert(0,self.refs_el)
+            
+            #add SynsetRelation element
+            new_rel_el = etree.SubElement(self.refs_el, 
+                                          "SynsetRelation",
+                                          {'provenance':  'odwn',
+                                           'relType'   :  reltype,
+                                           'target'    :  target})
+            existing_rels.add((reltype,target))
+            
+            #relations of synsets that are not yet added are indexed
+            #together with the synset
+            if not new_source:
+                self.parser.synsets_index_relation(new_rel_el)
+            
+            results.append((True,""))
+        
+        return results
         
 
             
\ No newline at end of file
@@ -1,8 +1,7 @@
 from synset import Synset
+from relation import Relation
 from collections import defaultdict
-import os 
 from lxml import etree 
-import gzip
 
 class Synsets():
     '''
@@ -19,11 +18,98 @@ class Synsets():
         @rtype: generator
         @return: generator of Synset XML elements
         '''
-        for synset_el in self.doc.iterfind(self.path_to_synset_els):
+        if self.mode == "stream":
+            synset_els = self.stream_iter("Synset")
+        else:
+            synset_els = self.doc.iterfind(self.path_to_synset_els)
+        
+        for synset_el in synset_els:
             yield Synset(synset_el,
                          self.reltypes,
-                         self.syn_ids) 
+                         self.syn_ids,
+                         self)
+    
+    
+    def synsets_index_synset(self,synset):
+        '''
+        add Synset element and its relations to the synset indexes
+        (index_element marks the synset as changed)
+        
+        @type  synset: accumulators.SynsetRecord
+        @param synset: values of Synset element
+        '''
+        self.syn_ids[synset.sy_id] = 0
+        self.synset_els.setdefault(synset.sy_id,synset.synset_el)
+        
+        for relation_el,reltype,target in synset.relations:
+            self.reltypes[reltype] = ""
+            self.incoming_rels[target].append(relation_el)
+        self.counts['num_relations'] += len(synset.relations)
+    
+    def synsets_unindex_synset(self,synset):
+        '''
+        remove Synset element from the synset indexes
+        
+        @type  synset: accumulators.SynsetRecord
+        @param synset: values of Synset element
+        '''
+        if self.synset_els.get(synset.sy_id) is synset.synset_el:
+            del self.synset_els[synset.sy_id]
+            del self.syn_ids[synset.sy_id]
+            
+            for relation_el,reltype,target in synset.relations:
+                self.synsets_unindex_relation(relation_el)
     
+    def synsets_index_relation(self,relation_el):
+        '''
+        add SynsetRelation element to the relation indexes
+        (ivar reltypes and ivar incoming_rels)
+        
+        @type  relation_el: lxml.etree._Element
+        @param relation_el: SynsetRelation element
+        '''
+        self.reltypes[relation_el.get("relType")] = ""
+        self.incoming_rels[relation_el.get("target")].append(relation_el)
+        self.counts['num_relations'] += 1
+        self.generation['Synset'] += 1
+        if self.validation_dirty:
+            self.validation_mark_relation(relation_el)
+    
+    def synsets_unindex_relation(self,relation_el):
+        '''
+        remove SynsetRelation element from the relation indexes
+        
+        @type  relation_el: lxml.etree._Element
+        @param relation_el: SynsetRelation element
+        '''
+        target = relation_el.get("target")
+        if relation_el in self.incoming_rels.get(target,[]):
+            self.incoming_rels[target].remove(relation_el)
+            if not self.incoming_rels[target]:
+                del self.incoming_rels[target]
+            self.counts['num_relations'] -= 1
+        self.generation['Synset'] += 1
+        if self.validation_dirty:
+            self.validation_mark_relation(relation_el)
+    
+    def synsets_incoming_relations(self,sy_id,reltype=None):
+        '''
+        return the relations that point to a synset
+        
+        @type  sy_id: str
+        @param sy_id: target synset identifier (for example eng-30-00325085-v)
+        
+        @type  reltype: str
+        @param reltype: [optional]. if provided, only relations of this type
+        are returned (for example 'has_hyponym')
+        
+        @rtype: list
+        @return: list of instances of class Relation
+        '''
+        self.stream_require_tree('synsets_incoming_relations')
+        return [Relation(relation_el,self)
+                for relation_el in self.incoming_rels.get(sy_id,[])
+                if reltype is None or relation_el.get("relType") == reltype]
     
     def synsets_find_synset(self,synset_identifier):
         '''
@@ -36,9 +122,10 @@ class Synsets():
         @rtype: instance
         @return: if found, instance of class Synset, else None
         '''
-        for synset_el in self.synsets_get_generator():
-            if synset_el.get_id() == synset_identifier:
-                return synset_el
+        self.stream_require_tree('synsets_find_synset')
+        synset_el = self.synset_els.get(synset_identifier)
+        if synset_el is not None:
+            return Synset(synset_el,self.reltypes,self.syn_ids,self)
         else:
             return None
     
@@ -89,17 +176,12 @@ class Synsets():
         @return: tuple
         @returun: (succes,message)
         '''    
-        if not hasattr(self, 'ili_dict'):
-            ili_nt_path = os.path.join(self.cwd,'resources','ili.nt.gz')  
-            infile = gzip.GzipFile(ili_nt_path)
-            self.set_ili_dict(infile)
-        
-        #get ili
-        if sy_id not in self.ili_dict:
+        self.stream_require_tree('synsets_add_synset')
+        #get ili (see Ili)
+        ili = self.ili_for(sy_id)
+        if ili is None:
             return (False,'no ili identifier found for %s' % sy_id)
         
-        ili = self.ili_dict[sy_id] 
-        
         #check if sy_id already exists
         if sy_id in self.syn_ids:
             return (False,'synset exists already: %s' % sy_id)
@@ -115,7 +197,7 @@ class Synsets():
 </Synset>'''.format(**locals())
         synset_el = etree.fromstring(base)
         
-        sy_obj = Synset(synset_el,self.reltypes,self.syn_ids)
+        sy_obj = Synset(synset_el,self.reltypes,self.syn_ids,self)
         
         for reltype,target in rels:
             succes,message = sy_obj.add_relation(reltype,target)
@@ -125,7 +207,11 @@ class Synsets():
                 
         if any([added_hypernym_rel,
                 sy_id.endswith('a')]):
-            self.lexicon_el.append(sy_obj.synset_el)
+            if self.batch_active():
+                self.batch_add(sy_obj.synset_el)
+            else:
+                self.lexicon_el.append(sy_obj.synset_el)
+                self.index_element(sy_obj.synset_el)
             return (True,'succes')
         else:
             return (False,'no hypernym rel added')
@@ -147,6 +233,7 @@ class Synsets():
         @param synset_el: default is None, odwn will be searched for element.
         else, an Synset instance has to be provided
         '''
+        self.stream_require_tree('synsets_remove_synset')
         #find synset
         if synset_el is None:
             synset_el = self.synsets_find_synset(sy_identifier)
@@ -162,18 +249,74 @@ class Synsets():
             hyponyms = synset_el.get_relations("has_hyponym")
             if not hyponyms:
                 synset_el.remove_me()
-                del self.syn_ids[sy_identifier]
                 
                 #remove all relations to this synset
-                for sy_obj in self.synsets_get_generator():
-                    for rel_obj in sy_obj.get_all_relations():
-                        target = rel_obj.get_target()
-                    
-                        if target == sy_identifier:
-                            rel_obj.remove_me()
+                for rel_obj in self.synsets_incoming_relations(sy_identifier):
+                    rel_obj.remove_me()
+    
+    def synsets_remove_many(self,sy_identifiers):
+        '''
+        remove all Synset elements of which the identifier is in
+        sy_identifiers (as Synset.remove_me, lexical entries and incoming
+        relations are not removed). the children of the Lexicon element
+        are scanned once and the elements are removed in a batch
+        (see Batch).
+        
+        @type  sy_identifiers: iterable
+        @param sy_identifiers: synset identifiers
+        (for example ['eng-30-89405202-n'])
+        
+        @rtype: set
+        @return: identifiers that were not found
+        '''
+        self.stream_require_tree('synsets_remove_many')
+        sy_identifiers = set(sy_identifiers)
+        found          = set()
+        
+        with self.batch():
+            for synset_el in self.lexicon_el.iterchildren("Synset"):
+                sy_id = synset_el.get("id")
+                if sy_id in sy_identifiers:
+                    self.batch_remove(synset_el)
+                    found.add(sy_id)
+        
+        return sy_identifiers - found
             
 
-    def validate_relation(self,source,reltype,target):
+    def synsets_add_relations(self,rels):
+        '''
+        add many SynsetRelation elements at once. the relations are grouped
+        by source synset, so that each source synset is looked up and its
+        existing relations are collected only once (see Synset.add_relations)
+        
+        @type  rels: list
+        @param rels: list of tuples (source,target,reltype)
+        
+        @rtype: list
+        @return: list of tuples (succes,message), one per relation
+        '''
+        self.stream_require_tree('synsets_add_relations')
+        by_source = defaultdict(list)
+        for position,(source,target,reltype) in enumerate(rels):
+            by_source[source].append((position,reltype,target))
+        
+        results = [None] * len(rels)
+        for source,source_rels in by_source.items():
+            sy_obj = self.synsets_find_synset(source)
+            
+            if sy_obj is None:
+                for position,reltype,target in source_rels:
+                    results[position] = (False,"source: %s not in existing synsets" % source)
+                continue
+            
+            source_results = sy_obj.add_relations([(reltype,target)
+                                                   for position,reltype,target in source_rels])
+            for (position,reltype,target),result in zip(source_rels,source_results):
+                results[position] = result
+        
+        return results
+    
+    def validate_relation(self,source,reltype,target,new_source=False,synsets=None):
         '''
         this method check if a relation is valid or not. invalid if:
         (1) target does not exist
@@ -192,15 +335,26 @@ class Synsets():
         @type  target: str
         @param target: target synset identifier
         
+        @type  new_source: bool
+        @param new_source: [optional]. if set to True, the source is a
+        synset that is being added (check (2) is skipped)
+        
+        @type  synsets: dict | set
+        @param synsets: [optional]. synset identifiers that exist
+        (default is ivar syn_ids)
+        
         @rtype: tuple
         @return: (succes,message)
         '''
+        if synsets is None:
+            synsets = self.syn_ids
+        
         #(1) target does not exist
-        if target not in self.syn_ids:
+        if target not in synsets:
             return (False,"target: %s not in existing synsets" % target)
 
         #(2) source does not exist
-        elif source not in self.syn_ids:
+        elif not new_source and source not in synsets:
             return (False,"source: %s not in existing synsets" % source)
 
         #(3) cross pos for has_hyponym has_hyperonym 
@@ -1,5 +1,10 @@
 echo "if you only see this message, then the unit test was succesful"
-python3 -m doctest -o FAIL_FAST wn_grid_parser.py
+python3 -m doctest -o FAIL_FAST snapshot.py batch.py les.py validation.py stream.py export.py graph.py similarity.py ic.py
+
+#the examples in wn_grid_parser.py need odwn 1.2 in resources/odwn
+if [ -f resources/odwn/odwn_orbn_gwg-LMF_1.2.xml.gz ]; then
+    python3 -m doctest -o FAIL_FAST wn_grid_parser.py
+fi
 
 
 echo 'epydoc --html relation.py lemma.py configuration.py clean.py synset.py le.py user_input.py orbn.py les.py stats.py synsets.py wn_grid_parser.py'
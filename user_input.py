@@ -14,6 +14,7 @@ class User():
 
 
     def annotate(self):
+        self.stream_require_tree('annotate')
         
         self.user       = input("what is your name?:")
         
@@ -44,6 +45,7 @@ large_synsets1 | large_synsets2 | synsets_5_10 ?  ')
         randomly pick x examples and use user input 
         to evaluate if they are correct
         '''
+        self.stream_require_tree('evaluate_resource')
         resource      = input('which resource do you want to evaluate?: ')
         num_instances = input('how many instances do you want to evaluate?: ')
         answer        = input('monosemous (m) or polysemous (p)?: ')
@@ -114,6 +116,7 @@ large_synsets1 | large_synsets2 | synsets_5_10 ?  ')
         there are LexicalEntry elements in the resource with _sub_ in it.
         this method provides a way to choose which one is correct
         '''
+        self.stream_require_tree('resolve_sub_les')
         annotation = {}
         synsets    = set()
         set_of_orbn_ids = set()
@@ -0,0 +1,187 @@
+#import xml parser (lxml is preferred, else built-in module xml is used)
+try:
+    from lxml import etree
+except ImportError:
+    import xml.etree.ElementTree as etree
+
+class Validation():
+    '''
+    validate ivar doc against a dtd or xml schema (.xsd), either the whole
+    document or only the children of the Lexicon element that changed since
+    the last validation (see validation_validate).
+
+    after a full validation against a schema, the changed children are
+    tracked for that schema in ivar validation_dirty (also if the full
+    validation failed, its errors are the baseline):
+        schema path -> {'elements'  -> changed LexicalEntry and Synset elements
+                                       (dict, in the order they changed),
+                        'structure' -> True if children were added or removed}
+
+    changes are tracked where the indexes are updated (index_element,
+    unindex_element, synsets_index_relation, synsets_unindex_relation,
+    les_set_provenance and les_set_annotator). elements that are changed
+    directly (for example element.attrib) are not tracked, and errors of
+    the baseline in children that did not change are only reported by a
+    full validation. release builds should use a full validation
+    (validate, export).
+    '''
+    def __init__(self):
+        pass
+
+    def validation_schema(self,schema_path):
+        '''
+        return (cached) dtd or xml schema
+
+        @type  schema_path: str
+        @param schema_path: full path to dtd or xml schema (.xsd)
+
+        @rtype: lxml.etree.DTD | lxml.etree.XMLSchema
+        @return: dtd or xml schema
+        '''
+        if getattr(self,'validation_schemas',None) is None:
+            self.validation_schemas = {}
+
+        if schema_path not in self.validation_schemas:
+            if schema_path.endswith('.xsd'):
+                schema = etree.XMLSchema(etree.parse(schema_path))
+            else:
+                schema = etree.DTD(schema_path)
+            self.validation_schemas[schema_path] = schema
+
+        return self.validation_schemas[schema_path]
+
+    def validation_mark(self,element,structure=False):
+        '''
+        mark a child of ivar lexicon_el as changed for all tracked schemas
+
+        @type  element: lxml.etree._Element
+        @param element: LexicalEntry or Synset element (None if only
+        the children of the Lexicon element changed)
+
+        @type  structure: bool
+        @param structure: True if children were added or removed
+        '''
+        for dirty in self.validation_dirty.values():
+            if element is not None:
+                dirty['elements'][element] = None
+            if structure:
+                dirty['structure'] = True
+
+    def validation_mark_relation(self,relation_el):
+        '''
+        mark the synset of a SynsetRelation element as changed
+
+        @type  relation_el: lxml.etree._Element
+        @param relation_el: SynsetRelation element
+        '''
+        refs_el = relation_el.getparent()
+        if refs_el is not None:
+            self.validation_mark(refs_el.getparent())
+
+    def validation_validate(self,schema_path=None,full=False):
+        '''
+        validate ivar doc against dtd or xml schema.
+        only the children of the Lexicon element that changed since the
+        last validation against schema_path are validated, unless full is
+        True or there was no full validation against schema_path yet.
+
+        the errors of a full validation are reported once, later
+        validations only report errors of changed children (for example,
+        the bundled xml schema does not allow Sense/@annotator, so a full
+        validation of odwn against it fails, but changed children can be
+        validated against it). after an incremental validation with errors,
+        the changed children stay tracked until they are valid.
+
+        @type  schema_path: str
+        @param schema_path: [optional]. full path to dtd or xml schema
+        (.xsd). default is the odwn dtd (class attribute dtd)
+
+        @type  full: bool
+        @param full: default is False. if True, the whole document is validated
+
+        @rtype: tuple
+        @return: (succes,list of all error messages)
+
+        >>> from wn_grid_parser import Wn_grid_parser
+        >>> instance = Wn_grid_parser("resources/test/odwn_test.xml.gz")
+        >>> dtd = "resources/odwn/odwn-orbn-lmf.dtd"
+        >>> instance.validation_validate(dtd)
+        (True, [])
+
+        an invalid child that is marked as changed is found
+        >>> synset_el = instance.synsets_find_synset("eng-30-00000101-n").synset_el
+        >>> synset_el.set("bogus","1")
+        >>> instance.validation_mark(synset_el)
+        >>> instance.validation_validate(dtd)
+        (False, ['Synset eng-30-00000101-n: No declaration for attribute bogus of element Synset'])
+        >>> del synset_el.attrib["bogus"]
+        >>> instance.validation_validate(dtd)
+        (True, [])
+        '''
+        self.stream_require_tree('validation_validate')
+        if schema_path is None:
+            schema_path = self.dtd
+
+        schema = self.validation_schema(schema_path)
+        dirty  = self.validation_dirty.get(schema_path)
+
+        if any([full,
+                dirty is None]):
+            errors = []
+            if not schema.validate(self.doc):
+                errors = [str(error) for error in schema.error_log.filter_from_errors()]
+            self.validation_dirty[schema_path] = {'elements'  : {},
+                                                  'structure' : False}
+        else:
+            errors = self.validation_fragments(schema,dirty)
+            if not errors:
+                self.validation_dirty[schema_path] = {'elements'  : {},
+                                                      'structure' : False}
+        return (not errors,errors)
+
+    def validation_fragments(self,schema,dirty):
+        '''
+        validate the changed children of ivar lexicon_el:
+        (1) each changed child that is still in the document is validated
+        (2) synset identifiers of changed synsets have to be unique
+        (3) if children were added or removed, the Lexicon element
+        has to contain lexical entries followed by synsets
+
+        @type  schema: lxml.etree.DTD | lxml.etree.XMLSchema
+        @param schema: dtd or xml schema
+
+        @type  dirty: dict
+        @param dirty: see ivar validation_dirty
+
+        @rtype: list
+        @return: list of error messages
+        '''
+        errors = []
+
+        for element in dirty['elements']:
+            if element.getparent() is not self.lexicon_el:
+                continue
+
+            #(1) validate child
+            element_id = element.get('id')
+            if not schema.validate(element):
+                for error in schema.error_log.filter_from_errors():
+                    errors.append('%s %s: %s' % (element.tag,element_id,error.message))
+
+            #(2) unique synset identifiers (the index holds the first synset)
+            if element.tag == 'Synset':
+                indexed_el = self.synset_els.get(element_id)
+                if indexed_el not in [None,element]:
+                    errors.append('%s %s: ID %s already defined' % (element.tag,
+                                                                    element_id,
+                                                                    element_id))
+
+        #(3) LexicalEntry+, Synset*
+        if dirty['structure']:
+            tags = [child_el.tag for child_el in self.lexicon_el.iterchildren('LexicalEntry','Synset')]
+            if 'LexicalEntry' not in tags:
+                errors.append('Lexicon: no LexicalEntry')
+            elif 'Synset' in tags and 'LexicalEntry' in tags[tags.index('Synset'):]:
+                errors.append('Lexicon: LexicalEntry after Synset')
+
+        return errors
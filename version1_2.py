@@ -85,7 +85,7 @@ def remove_sub_ids():
         if base in correct_pairs:
             if target in correct_pairs[base]:
                 remove=False
-                le_obj.sense_el.attrib['annotator'] = 'anneleen'
+                my_parser.les_set_annotator(le_obj,'anneleen')
         
         if remove:
             removed +=1
@@ -117,10 +117,9 @@ def remove_le_ids():
     for le_obj in my_parser.les_get_generator():
         target = le_obj.get_synset_id()
         if target in checked_synsets:
-            le_obj.sense_el.attrib['annotator'] = checked_synsets[target]
+            my_parser.les_set_annotator(le_obj,checked_synsets[target])
 
-        if le_obj.get_id() in le_ids_to_remove:
-            le_obj.remove_me()
+    my_parser.les_remove_many(le_ids_to_remove)
 
     logger.info('removed %s le_ids' % len(le_ids_to_remove))
 
@@ -339,7 +338,7 @@ logger = start_logger()
 
 #STEP X: ADD ANNOTATOR ATTR TO ALL LE OBJS
 for le_obj in my_parser.les_get_generator(mw=True):
-    le_obj.sense_el.attrib['annotator'] = ''
+    my_parser.les_set_annotator(le_obj,'')
 
 #STEP X: CHANGE VERSION INFO
 my_parser.lexicon_el.attrib['label'] = 'ODWN-ORBN-LMF-1.2'
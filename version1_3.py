@@ -56,10 +56,7 @@ to_remove = set()
 num_to_remove = len(to_remove)
 logger.info('%s le ids found to remove' % num_to_remove)
 
-for le_obj in my_parser.les_get_generator():
-    le_id = le_obj.get_id()
-    if le_id in to_remove:
-        le_obj.remove_me()
+my_parser.les_remove_many(to_remove)
     
 
 #STEP X: RUN STATS
@@ -2,7 +2,7 @@
 import os 
 import pickle
 import gzip 
-import subprocess 
+import time
 from collections import defaultdict
 
 #import xml parser (lxml is preferred, else built-in module xml is used)
@@ -13,6 +13,7 @@ except ImportError:
 
 #import modules
 from configuration import xml_paths
+from accumulators import LeRecord, SynsetRecord
 from synsets import Synsets
 from les import Les
 from stats import Stats
@@ -20,6 +21,17 @@ from lemma import Lemma
 from clean import Clean
 from orbn import Orbn
 from user_input import User
+from snapshot import Snapshot
+from graph import Graph
+from similarity import Similarity
+from ic import Ic
+from batch import Batch
+from ili import Ili
+from stream import Stream
+from writer import Writer
+from export import Export
+from wn_lmf import Wn_lmf
+from validation import Validation
 
 class Wn_grid_parser(Synsets,
                      Les,
@@ -27,19 +39,61 @@ class Wn_grid_parser(Synsets,
                      Lemma,
                      Clean,
                      User,
-                     Orbn):
+                     Orbn,
+                     Snapshot,
+                     Graph,
+                     Similarity,
+                     Ic,
+                     Batch,
+                     Ili,
+                     Stream,
+                     Writer,
+                     Export,
+                     Wn_lmf,
+                     Validation):
     '''
     Parser for Global WordNet Grid LMF (inspection, stats, editing)
     
     @type  path_wn_grid_lmf: str
     @param path_wn_grid_lmf: path to wn grid lmf file
 
+    @type  snapshot: bool
+    @param snapshot: default is False. if set to True, the parsed file is
+    stored as a binary snapshot next to path_wn_grid_lmf on the first load,
+    later loads read the snapshot instead of parsing the xml.
+
+    @type  mode: str
+    @param mode: default is "tree", the document is kept in memory.
+    if set to "stream", the file is parsed incrementally when it is
+    iterated (read-only, see Stream).
+
     @ivar  path_wn_grid_lmf: str
     @param path_wn_grid_lmf: path to wn grid lmf file
     
     @ivar  doc: lxml.etree._ElementTree
     @param doc: param path_wn_grid_lmf parsed with etree.parse
     
+    @ivar  load_times: dict
+    @param load_times: seconds spent per loading step
+    ('snapshot' | 'parse', 'index')
+    
+    @ivar  generation: dict
+    @param generation: mapping from tag (LexicalEntry | Synset) to the
+    number of times children of the Lexicon element with that tag
+    were modified (relations count as Synset modifications)
+    
+    @ivar  stats_cache: dict
+    @param stats_cache: mapping from accumulator name to
+    (generations of its tags,result) (see stats_compute)
+    
+    @ivar  batch_ops: None | dict
+    @param batch_ops: edits queued inside a batch (see Batch.batch)
+
+    @ivar  validation_dirty: dict
+    @param validation_dirty: mapping from schema path to the children
+    of the Lexicon element that changed since the last validation
+    (see Validation)
+    
     >>> path="resources/odwn/odwn_orbn_gwg-LMF_1.2.xml.gz"
     >>> instance = Wn_grid_parser(path_wn_grid_lmf=path)
     
@@ -73,8 +127,27 @@ class Wn_grid_parser(Synsets,
     >>> instance.lemma_num_senses("huis",pos="noun")
     6
     '''
-    def __init__(self,path_wn_grid_lmf=None):
+    #methods that (un)index a child of the Lexicon element (see index_lexicon)
+    #the stats methods update the live counters and come first,
+    #they need the state of the indexes before the change
+    #(each method gets the record of the child, see index_records)
+    index_methods   = {'LexicalEntry' : ['stats_index_le','les_index_le','lemma_index_le'],
+                       'Synset'       : ['stats_index_synset','synsets_index_synset']}
+    unindex_methods = {'LexicalEntry' : ['stats_unindex_le','les_unindex_le','lemma_unindex_le'],
+                       'Synset'       : ['stats_unindex_synset','synsets_unindex_synset']}
+    
+    #the values of a child are read once for all (un)index methods
+    index_records   = {'LexicalEntry' : LeRecord,
+                       'Synset'       : SynsetRecord}
+    
+    #attributes filled by index_lexicon (stored in snapshots)
+    index_attrs     = ['reltypes','syn_ids','synset_els','orbn_ids','le_els',
+                       'synset_les','lemma_les','incoming_rels','counts']
+    
+    def __init__(self,path_wn_grid_lmf=None,snapshot=False,mode="tree"):
         self.path_wn_grid_lmf = path_wn_grid_lmf
+        self.snapshot         = snapshot
+        self.mode             = mode
         
         #read xml file and set general variables
         self.initialize()
@@ -82,49 +155,114 @@ class Wn_grid_parser(Synsets,
     def initialize(self):
         '''
         (1) parse ivar path_wn_grid_lmf into ivar doc
-        (2) set general class attributes
+        (or load ivar doc from the snapshot if ivar snapshot is True).
+        if ivar mode is "stream", no document is kept and only
+        the synset identifiers and relation types are indexed (see Stream)
+        (2) set general class attributes and build indexes
+        (3) if ivar snapshot is True, write snapshot if it was not loaded
+        
+        ivar load_times stores the seconds spent per step
         '''
+        self.cwd      = os.path.dirname(os.path.realpath(__file__))
+             
+        #make xml paths class attributes
+        [setattr(self, key, value) for key,value in xml_paths.items()]
+        
+        self.load_times = {}
+        self.generation = defaultdict(int)
+        self.stats_cache = {}
+        self.batch_ops  = None
+        self.validation_dirty = {}
+        start = time.time()
+        
+        if self.mode == "stream":
+            self.doc        = None
+            self.lexicon_el = None
+            self.stream_index()
+            self.load_times['index'] = time.time() - start
+            return
+        
+        if self.snapshot and self.snapshot_load():
+            self.load_times['snapshot'] = time.time() - start
+            return
+        
         infile        = gzip.GzipFile(self.path_wn_grid_lmf)
         self.doc      = etree.parse(infile,etree.XMLParser(remove_blank_text=True))
         self.lexicon_el = self.doc.find("Lexicon")
+        self.load_times['parse'] = time.time() - start
+        
+        start = time.time()
+        self.index_lexicon()
+        self.load_times['index'] = time.time() - start
+        
+        if self.snapshot:
+            self.snapshot_write()
+    
+    def index_lexicon(self):
+        '''
+        build all indexes in one pass over the children of ivar lexicon_el.
+        the values of each child are read once into a record
+        (class attribute index_records), which is passed to the methods
+        listed for its tag in class attribute index_methods.
+        '''
         self.reltypes = {}
         self.syn_ids  = {}
-        self.cwd      = os.path.dirname(os.path.realpath(__file__))
-             
-        #make xml paths class attributes
-        [setattr(self, key, value) for key,value in xml_paths.items()]
+        self.synset_els = {}
+        self.orbn_ids = {}
+        self.le_els   = {}
+        self.synset_les = defaultdict(list)
+        self.lemma_les  = defaultdict(dict)
+        self.incoming_rels = defaultdict(list)
+        self.stats_reset_counts()
         
-        #set of synset identifiers
-        self.syn_ids = {sy_el.get_id():0
-                        for sy_el in self.synsets_get_generator()}
+        index_methods = {tag: [getattr(self,name) for name in names]
+                         for tag,names in self.index_methods.items()}
         
-        #relations
-        self.reltypes = {rel_obj.get_reltype(): ""
-                         for sy_obj in self.synsets_get_generator()
-                         for rel_obj in sy_obj.get_all_relations()}
+        for child_el in self.lexicon_el.iterchildren(*self.index_records):
+            record = self.index_records[child_el.tag](child_el)
+            for index_method in index_methods[child_el.tag]:
+                index_method(record)
+    
+    def index_element(self,element):
+        '''
+        add a (new) child of ivar lexicon_el to the indexes
         
-        self.orbn_ids = {le_obj.get_sense_id(): ""
-                         for le_obj in self.les_get_generator()}
+        @type  element: lxml.etree._Element
+        @param element: LexicalEntry or Synset element
+        '''
+        record = self.index_records[element.tag](element)
+        for name in self.index_methods[element.tag]:
+            getattr(self,name)(record)
+        self.generation[element.tag] += 1
+        self.validation_mark(element,structure=True)
+    
+    def unindex_element(self,element):
+        '''
+        remove a (removed) child of ivar lexicon_el from the indexes
+        
+        @type  element: lxml.etree._Element
+        @param element: LexicalEntry or Synset element
+        '''
+        record = self.index_records[element.tag](element)
+        for name in self.unindex_methods[element.tag]:
+            getattr(self,name)(record)
+        self.generation[element.tag] += 1
+        self.validation_mark(None,structure=True)
     
     def validate(self,dtd_path):
         '''
-        validate against dtd
+        validate the whole document against dtd
+        (see Validation for validating only the changed elements)
         
         @type  dtd_path: str
-        @param dtd_path: full path to dtd
+        @param dtd_path: full path to dtd (or xml schema)
         
         @rtype: tuple
-        @return: (succes,message)
+        @return: (succes,message), message contains all errors (one per line)
         '''
-        f       = open(dtd_path)
-        dtd     = etree.DTD(f)
-        message = ""
-        
-        succes = dtd.validate(self.doc)
-        if not succes:
-            message = dtd.error_log.filter_from_errors()[0]
-        
-        return (succes,message)
+        self.stream_require_tree('validate')
+        succes,errors = self.validation_validate(dtd_path,full=True)
+        return (succes,'\n'.join(errors))
         
     def export(self,output_path,format='lmf'):
         '''
@@ -132,38 +270,44 @@ class Wn_grid_parser(Synsets,
         self.doc is first validated against dtd.
         if this fails, export will not be done
         
-        @type  output_path: str
-        @param output_path: output path
+        @type  output_path: str | dict
+        @param output_path: output path. lmf output is gzipped if the path
+        ends with .gz and compressed with zstandard if it ends with .zst
+        (see Writer). a mapping format -> output path can be used to
+        choose the path of each format (see Export.export_output_paths)
         
-        @type  format: str
+        @type  format: str | list
         @param format: default is 'lmf', 
         
         others include: 'omw', which is the Open Multilingual Wordnet format
         (http://compling.hss.ntu.edu.sg/omw/).
         'ili': mapping between pwn and odwn in rdf
-        The output will be stored in the 'resources' folder
+        The output is stored in the 'resources' folder by default
+        'wn-lmf-1.0': WN-LMF 1.0 with the Collaborative Interlingual Index
+        (see Wn_lmf), stored in output_path
+        
+        a list of formats (for example ['lmf','omw','ili']) is exported
+        in one pass over the document (see Export)
+        
+        @rtype: tuple
+        @return: (succes,list of error messages) of the dtd validation,
+        or of the WN-LMF 1.0 validation
         '''
+        self.stream_require_tree('export')
         self.clean()
         
         #validate it
-        validation,message = self.validate(self.dtd)
+        validation,errors = self.validation_validate(self.dtd,full=True)
         
         if validation:
-            if format == 'lmf':
-                with open(output_path,"wb") as outfile:
-                    self.doc.write(outfile,
-                                   pretty_print=True,
-                                   xml_declaration=True,
-                                   encoding='utf-8')
-            elif format == 'omw':
-                self.omw_export()
-            
-            elif format == 'ili':
-                self.ili_map_export()
+            if isinstance(format,str):
+                format = [format]
+            return self.export_formats(output_path,format)
                     
         else:
             print("dtd validation was not succesful.")
-            print(message)
+            print('\n'.join(errors))
+            return (validation,errors)
     
     
     def ili_map_export(self):
@@ -171,40 +315,10 @@ class Wn_grid_parser(Synsets,
         creates export file in resources/ili-map-odwnVERSION.ttl
         based on the original English one at:
         https://raw.githubusercontent.com/globalwordnet/ili/master/ili-map.ttl
+        (see Export)
         '''
-        version = self.__version__.replace('.','')
-        output_path = os.path.join(self.cwd,
-                                   'resources',
-                                   'ili-map-odwn%s.ttl' % version)
-        
-        synonyms_dict = defaultdict(set)
-        for le_obj in self.les_get_generator():
-            synset_id = le_obj.get_synset_id()
-            lemma = le_obj.get_lemma()
-            synonyms_dict[synset_id].add(lemma)
-        
-        with open(output_path,'w') as outfile:
-            
-            outfile.write('\n')
-            outfile.write('@prefix\towl:\t<http://www.w3.org/2002/07/owl#> .\n')
-            outfile.write('\n')
-            outfile.write('### Wordnets\n')
-            outfile.write('@prefix\todwn13:\t<http://odwn-rdf.vu.nl/odwn13/> .\n')
-            outfile.write('\n')
-            outfile.write('### this file\n')
-            outfile.write('\n')
-            outfile.write('@prefix ili: <http://globalwordnet.org/ili/> .\n')
-            outfile.write('@base <http://globalwordnet.org/ili/ili-map.ttl>.\n')
-            outfile.write('\n')
-            for synset_obj in self.synsets_get_generator():
-                ili = synset_obj.get_ili()
-                synset_id = synset_obj.get_id()
-                if synset_id.startswith('eng-30'):
-                    offset_pos = synset_id.replace('eng-30-','')
-                    if synonyms_dict[synset_id]:
-                        synonyms = ', '.join(synonyms_dict[synset_id])
-                        outline = 'ili:{ili}\towl:sameAs\todwn13:{offset_pos} . # {synonyms}\n'.format(**locals())
-                        outfile.write(outline)
+        self.stream_require_tree('ili_map_export')
+        self.export_formats(None,['ili'])
             
     def omw_export(self):
         '''
@@ -213,48 +327,10 @@ class Wn_grid_parser(Synsets,
         (2) copies LICENSE in it
         (3) copies reference in it
         (4) creates wn-data-nld.tab
+        (see Export)
         '''
-        cwd = self.cwd
-        out = os.path.join(self.cwd,'resources','nld')
-        
-        #(1) creates new folder in resources: resources/nld
-        command = 'rm -rf {out} && mkdir {out}'.format(**locals())
-        subprocess.call(command,shell=True)
-        
-        #(2) copies LICENSE in it
-        command = 'cp {cwd}/LICENSE.md {out}/LICENSE'.format(**locals())
-        subprocess.call(command,shell=True)
-        
-        #(3) copies reference in it
-        command = 'cp {cwd}/citation.bib {out}/'.format(**locals())
-        subprocess.call(command,shell=True)
-        
-        #(4) creates wn-data-nld.tab
-        output_path = os.path.join(out,'wn-data-nld.tab')
-        with open(output_path,'w') as outfile:
-            
-            #write header
-            header = '\t'.join([
-                                '# Open Dutch WordNet',
-                                'nld',
-                                'http://wordpress.let.vupr.nl/odwn/',
-                                'CC BY SA 4.0'])
-            outfile.write(header+'\n')
-            for le_obj in self.les_get_generator():
-                
-                synset_id = le_obj.get_synset_id()
-                lemma = le_obj.get_lemma()
-                if not synset_id:
-                    continue
-                prov,version,offset,pos = synset_id.split('-')
-                
-                if all([prov == 'eng',
-                        lemma]):
-                    output = '{offset}-{pos}\tnld:lemma\t{lemma}\n'.format(**locals())
-                    outfile.write(output)
-                    
-                
-            
+        self.stream_require_tree('omw_export')
+        self.export_formats(None,['omw'])
             
     def get_stats(self,verbose=False):
         '''
@@ -266,31 +342,36 @@ class Wn_grid_parser(Synsets,
         '''
         Stats.__init__(self)
         
-        num_rels,none_targets = self.stats_rels()
-        tops                  = self.tops()
+        #all accumulators in one pass over the document
+        results               = self.stats_compute()
+        
+        num_rels              = results['rels']['num_rels']
+        none_targets          = results['rels']['impossible']
+        tops                  = results['tops']
         with open( os.path.join(self.cwd,'resources','tops.bin'),'wb') as outfile:
             pickle.dump(tops,outfile)
-        empty_synsets         = self.stats_empty_synsets() 
-        average_polysemy, polysemy_dict = self.polysemy_dict()
-        self.stats_large_synsets()
+        empty_synsets         = self.stats_store_empty_synsets(results['empty_synsets']) 
+        average_polysemy, polysemy_dict = results['polysemy']
+        self.stats_store_large_synsets(results['large_synsets'])
 
         self.stats = {'num_synsets'               : self.stats_num_synsets(),
-                      'num_lexical_entries'       : self.stats_num_les(),
+                      'num_lexical_entries'       : results['num_lexical_entries'],
                       'num_empty_pwn_synsets'     : empty_synsets['num_empty_pwn_synsets'],
                       'num_empty_odwn_synsets'    : empty_synsets['num_empty_odwn_synsets'],
                       'empty_leave_odwn_synsets'  : empty_synsets['leave_empty_odwn_synsets'],
                       'num_relations'             : num_rels,
                       'impossible_rels'           : none_targets,
-                      'empty_lemmas'              : self.empty_lemmas(),
+                      'impossible_rels_by_reason' : results['rels']['by_reason'],
+                      'empty_lemmas'              : results['empty_lemmas'],
                       'tops'                      : tops,
-                      'sy_no_gloss,empty_glosses,one_word' : self.no_gloss(),
-                      'pos_counts'                : self.count_pos(),
-                      'provenance'                : self.resources_check(),
+                      'sy_no_gloss,empty_glosses,one_word' : results['sy_no_gloss,empty_glosses,one_word'],
+                      'pos_counts'                : results['pos_counts'],
+                      'provenance'                : results['provenance'],
                       'polysemy_dict'             : polysemy_dict,
                       'average_polysemy'          : average_polysemy,
-                      'bidirectional_relations'   : self.missing_bidirectional_relations("has_hyponym","has_hyperonym"),
-                      'no_rels'                   : self.sy_no_rels(),
-                      'contradicting'             : self.contradicting_rels()
+                      'bidirectional_relations'   : results['bidirectional_relations'],
+                      'no_rels'                   : results['no_rels'],
+                      'contradicting'             : results['contradicting']
                      }
 
         
@@ -302,13 +383,16 @@ class Wn_grid_parser(Synsets,
                 if key in ["bidirectional_relations","polysemy_dict",'empty_leave_odwn_synsets',
                            "impossible_rels","tops","no_rels","contradicting"]:
                     print(key,len(value))     
+                elif key == 'impossible_rels_by_reason':
+                    print(key,{reason: len(rels) for reason,rels in value.items()})
                 else:                
                     print(key,value)
     
     def set_ili_dict(self,file_object):
         '''
         given the path to mapping from ili to eng-30 synset identifiers
-        this method returns the mapping itself
+        this method returns the mapping itself (and sets the ili index,
+        see Ili)
         
         <http://globalwordnet.org/ili/i117659> 
         <http://www.w3.org/2002/07/owl#sameAs> 
@@ -322,20 +406,13 @@ class Wn_grid_parser(Synsets,
         @rtype: dict
         @return: mapping eng-30 synset identifier -> ili
         '''
-        self.ili_dict = {}
-        
-        for line in file_object:
-            if 'http://www.w3.org/2002/07/owl#sameAs>' in line:
-                s,r,o,e = line.strip().split()
-                ili = s.split('/ili/')[1][:-1]
-                eng = o.split('/wn30/')[1][:-1]
-                eng = eng.replace('eng-','eng-30-')
-                self.ili_dict[eng] = ili
+        self.ili_set_index(self.ili_read_nt(file_object))
 
     def clean(self):
         '''
         clean resource
         '''
+        self.stream_require_tree('clean')
         self.clean_provenance_to_all_les()
         self.clean_impossible_relations()
         self.clean_bidirectional_relations()
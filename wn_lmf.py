@@ -0,0 +1,315 @@
+import os
+
+#import xml parser (lxml is preferred, else built-in module xml is used)
+try:
+    from lxml import etree
+except ImportError:
+    import xml.etree.ElementTree as etree
+
+class Wn_lmf():
+    '''
+    convert the resource to WN-LMF 1.0 (the format of the Collaborative
+    Interlingual Index, https://github.com/globalwordnet/schemas),
+    export(output_path,format='wn-lmf-1.0').
+
+    the resources are read from resources/cili (see wn_lmf_resources):
+        'dtd'            -> WN-LMF-1.0.dtd
+        'starting_point' -> LexicalResource and Lexicon element (with metadata)
+        'mapping'        -> relation types odwn -> WN-LMF (tab separated)
+        'new_synsets'    -> ili definitions of new odwn synsets (tab separated,
+                            odwn identifier in column 3, definition in column 8)
+        'extra'          -> lexical entries and synsets that are added
+
+    synsets with an ili or an ili definition are converted, together with
+    their lexical entries and the relations between them.
+    the converted elements are written to the output file one at a time
+    (the output document is never built in memory) and each element is
+    validated against the dtd when it is written (see wn_lmf_validate_element).
+    '''
+    #file names in resources/cili
+    wn_lmf_resources = {'dtd'            : 'WN-LMF-1.0.dtd',
+                        'starting_point' : 'the_starting_point.xml',
+                        'mapping'        : 'reltypes_wn_lmf.tsv',
+                        'new_synsets'    : 'new_synsets_v2.csv',
+                        'extra'          : 'extra_entries.xml'}
+
+    def __init__(self):
+        pass
+
+    def wn_lmf_path(self,resource):
+        '''
+        return path to resource in resources/cili
+
+        @type  resource: str
+        @param resource: key of wn_lmf_resources
+
+        @rtype: str
+        @return: full path
+        '''
+        return os.path.join(self.cwd,'resources','cili',self.wn_lmf_resources[resource])
+
+    def wn_lmf_read_mapping(self):
+        '''
+        read mapping of relation types
+
+        @rtype: dict
+        @return: mapping odwn relation type -> WN-LMF relation type
+        '''
+        mapping = {}
+        with open(self.wn_lmf_path('mapping'),encoding='utf-8') as infile:
+            for line in infile:
+                split = line.strip().split('\t')
+                if len(split) == 2:
+                    mapping[split[0]] = split[1]
+        return mapping
+
+    def wn_lmf_read_new_synsets(self):
+        '''
+        read ili definitions of new odwn synsets
+        (rows without an ili definition or with 'x' are ignored)
+
+        @rtype: dict
+        @return: mapping odwn synset identifier -> ili definition
+        '''
+        new_synsets = {}
+        with open(self.wn_lmf_path('new_synsets'),encoding='utf-8') as infile:
+            next(infile)
+            for line in infile:
+                split = line.strip().split('\t')
+                if len(split) < 8:
+                    continue
+
+                odwn_id,ilidef = split[2],split[7]
+                if all([ilidef,
+                        ilidef != 'x']):
+                    new_synsets[odwn_id] = ilidef
+        return new_synsets
+
+    def wn_lmf_added_synsets(self,new_synsets):
+        '''
+        return identifiers of the synsets that are converted
+
+        @type  new_synsets: dict
+        @param new_synsets: see wn_lmf_read_new_synsets
+
+        @rtype: set
+        @return: identifiers of synsets with an ili or an ili definition
+        '''
+        added_synsets = set()
+        for synset_obj in self.synsets_get_generator():
+            synset_id = synset_obj.get_id()
+            if any([synset_obj.get_ili() is not None and synset_id,
+                    synset_id in new_synsets]):
+                added_synsets.add(synset_id)
+        return added_synsets
+
+    def wn_lmf_les(self,added_synsets):
+        '''
+        yield WN-LMF LexicalEntry elements of the lexical entries of the
+        converted synsets (one per sense identifier, multi-words are not
+        taken into account)
+
+        @type  added_synsets: set
+        @param added_synsets: see wn_lmf_added_synsets
+
+        @rtype: generator
+        @return: generator of LexicalEntry elements
+        '''
+        added_sense_ids = set()
+        for counter,le_obj in enumerate(self.les_get_generator()):
+            synset_id = le_obj.get_synset_id()
+            sense_id  = le_obj.get_sense_id()
+
+            if all([synset_id in added_synsets,
+                    sense_id not in added_sense_ids]):
+                le_el = etree.Element('LexicalEntry',attrib={'id' : 'w%s' % counter})
+                etree.SubElement(le_el,'Lemma',attrib={'writtenForm'  : le_obj.get_lemma(),
+                                                       'partOfSpeech' : le_obj.get_pos()[0]})
+                etree.SubElement(le_el,'Sense',attrib={'id'     : sense_id,
+                                                       'synset' : synset_id})
+                added_sense_ids.add(sense_id)
+                yield le_el
+
+    def wn_lmf_synsets(self,added_synsets,new_synsets,mapping):
+        '''
+        yield WN-LMF Synset elements of the converted synsets:
+        eng synsets get their English glosses as definitions, new odwn
+        synsets get their ili definition (and ili 'in'). relations are
+        mapped (see wn_lmf_read_mapping), relations with a type that is
+        not mapped or with a target that is not converted are ignored.
+
+        @type  added_synsets: set
+        @param added_synsets: see wn_lmf_added_synsets
+
+        @type  new_synsets: dict
+        @param new_synsets: see wn_lmf_read_new_synsets
+
+        @type  mapping: dict
+        @param mapping: see wn_lmf_read_mapping
+
+        @rtype: generator
+        @return: generator of Synset elements
+        '''
+        for synset_obj in self.synsets_get_generator():
+            synset_id = synset_obj.get_id()
+            if synset_id not in added_synsets:
+                continue
+
+            ili = 'in' if synset_id in new_synsets else synset_obj.get_ili()
+            synset_el = etree.Element('Synset',attrib={'id'  : synset_id,
+                                                       'ili' : ili})
+
+            if synset_id.startswith('eng'):
+                for def_en in synset_obj.get_glosses(languages=['en']):
+                    etree.SubElement(synset_el,'Definition').text = def_en
+
+            elif synset_id in new_synsets:
+                etree.SubElement(synset_el,'Definition').text    = new_synsets[synset_id]
+                etree.SubElement(synset_el,'ILIDefinition').text = new_synsets[synset_id]
+
+            for rel_obj in synset_obj.get_all_relations():
+                reltype = rel_obj.get_reltype()
+                target  = rel_obj.get_target()
+                if all([reltype in mapping,
+                        target in added_synsets]):
+                    etree.SubElement(synset_el,'SynsetRelation',attrib={'relType' : mapping[reltype],
+                                                                        'target'  : target})
+            yield synset_el
+
+    def wn_lmf_id_attributes(self,dtd):
+        '''
+        return attributes of type ID and IDREF in the dtd
+
+        @type  dtd: lxml.etree.DTD
+        @param dtd: WN-LMF dtd
+
+        @rtype: tuple
+        @return: (ID attributes,IDREF attributes), both are mappings
+        element name -> list of attribute names
+        '''
+        id_attributes    = {}
+        idref_attributes = {}
+        for dtd_el in dtd.iterelements():
+            for attribute in dtd_el.iterattributes():
+                if attribute.type == 'id':
+                    id_attributes.setdefault(dtd_el.name,[]).append(attribute.name)
+                elif attribute.type == 'idref':
+                    idref_attributes.setdefault(dtd_el.name,[]).append(attribute.name)
+        return id_attributes,idref_attributes
+
+    def wn_lmf_validate_element(self,dtd,element,validation):
+        '''
+        validate a LexicalEntry or Synset element against the dtd.
+        references to identifiers outside the element can not be checked
+        by the dtd, so the identifiers and references are collected in
+        param validation and checked when all elements are written
+        (see wn_lmf_export).
+
+        @type  dtd: lxml.etree.DTD
+        @param dtd: WN-LMF dtd
+
+        @type  element: lxml.etree._Element
+        @param element: LexicalEntry or Synset element
+
+        @type  validation: dict
+        @param validation: 'ids' (set), 'idrefs' (dict identifier -> element
+        identifier), 'id_attributes' and 'idref_attributes'
+        (see wn_lmf_id_attributes) and 'errors' (list of error messages)
+        '''
+        element_id = element.get('id')
+
+        if not dtd.validate(element):
+            for error in dtd.error_log.filter_from_errors():
+                if error.type_name != 'DTD_UNKNOWN_ID':
+                    validation['errors'].append('%s %s: %s' % (element.tag,
+                                                              element_id,
+                                                              error.message))
+
+        for el in element.iter():
+            for attribute in validation['id_attributes'].get(el.tag,[]):
+                identifier = el.get(attribute)
+                if identifier in validation['ids']:
+                    validation['errors'].append('%s %s: ID %s already defined' % (element.tag,
+                                                                                  element_id,
+                                                                                  identifier))
+                validation['ids'].add(identifier)
+
+            for attribute in validation['idref_attributes'].get(el.tag,[]):
+                identifier = el.get(attribute)
+                if identifier is not None:
+                    validation['idrefs'].setdefault(identifier,element_id)
+
+    def wn_lmf_export(self,output_path):
+        '''
+        convert the resource to WN-LMF 1.0 and validate it against the dtd.
+        the output file is only kept if it is valid. output_path is
+        gzipped if it ends with .gz (see Writer).
+
+        @type  output_path: str
+        @param output_path: output path
+
+        @rtype: tuple
+        @return: (succes,list of error messages)
+        '''
+        dtd         = etree.DTD(self.wn_lmf_path('dtd'))
+        mapping     = self.wn_lmf_read_mapping()
+        new_synsets = self.wn_lmf_read_new_synsets()
+
+        xml_parser     = etree.XMLParser(remove_blank_text=True)
+        starting_point = etree.parse(self.wn_lmf_path('starting_point'),xml_parser)
+        extra_el       = etree.parse(self.wn_lmf_path('extra'),xml_parser).getroot()
+        root_el        = starting_point.getroot()
+        lexicon_el     = root_el.find('Lexicon')
+
+        added_synsets = self.wn_lmf_added_synsets(new_synsets)
+        added_synsets.update(synset_el.get('id')
+                             for synset_el in extra_el.iterchildren('Synset'))
+
+        id_attributes,idref_attributes = self.wn_lmf_id_attributes(dtd)
+        validation = {'ids'              : {lexicon_el.get('id')},
+                      'idrefs'           : {},
+                      'id_attributes'    : id_attributes,
+                      'idref_attributes' : idref_attributes,
+                      'errors'           : []}
+
+        #written next to output_path and renamed if valid
+        path_tmp = os.path.join(os.path.dirname(output_path),
+                                '.' + os.path.basename(output_path))
+
+        number_of_les = 0
+        with self.writer_open(path_tmp) as outfile:
+            with etree.xmlfile(outfile,encoding='utf-8') as xf:
+                xf.write_declaration()
+                xf.write_doctype(starting_point.docinfo.doctype)
+                with xf.element(root_el.tag,nsmap=root_el.nsmap):
+                    xf.write('\n')
+                    with xf.element(lexicon_el.tag,attrib=dict(lexicon_el.attrib)):
+                        xf.write('\n')
+                        elements = [self.wn_lmf_les(added_synsets),
+                                    extra_el.iterchildren('LexicalEntry'),
+                                    self.wn_lmf_synsets(added_synsets,new_synsets,mapping),
+                                    extra_el.iterchildren('Synset')]
+                        for generator in elements:
+                            for element in generator:
+                                if element.tag == 'LexicalEntry':
+                                    number_of_les += 1
+
+                                self.wn_lmf_validate_element(dtd,element,validation)
+                                xf.write(element,pretty_print=True)
+                    xf.write('\n')
+
+        errors = validation['errors']
+        if not number_of_les:
+            errors.append('Lexicon %s: no LexicalEntry' % lexicon_el.get('id'))
+
+        for identifier,element_id in validation['idrefs'].items():
+            if identifier not in validation['ids']:
+                errors.append('%s: IDREF references an unknown ID "%s"' % (element_id,
+                                                                          identifier))
+
+        if errors:
+            os.remove(path_tmp)
+        else:
+            os.replace(path_tmp,output_path)
+
+        return (not errors,errors)
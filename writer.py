@@ -0,0 +1,62 @@
+import gzip
+from contextlib import contextmanager
+
+class Writer():
+    '''
+    write ivar doc (pretty printed LMF) to a plain or compressed file.
+
+    lxml serializes the document to the file object in small buffers,
+    so the serialized document is never held in memory as a whole.
+    output files ending with .gz are gzipped, files ending with .zst
+    are compressed with zstandard (the zstandard module is needed).
+    '''
+    #compression level of the gzip command line tool
+    #(level 9 of the gzip module is much slower for little gain)
+    writer_gzip_level = 6
+
+    def __init__(self):
+        pass
+
+    @contextmanager
+    def writer_open(self,output_path):
+        '''
+        open output_path for writing bytes, compressed based on the extension
+
+        @type  output_path: str
+        @param output_path: output path (.gz | .zst | other)
+
+        @rtype: file object
+        @return: binary file object
+        '''
+        if output_path.endswith('.gz'):
+            with gzip.open(output_path,'wb',compresslevel=self.writer_gzip_level) as outfile:
+                yield outfile
+
+        elif output_path.endswith('.zst'):
+            import zstandard
+
+            with open(output_path,'wb') as raw_outfile:
+                with zstandard.ZstdCompressor().stream_writer(raw_outfile) as outfile:
+                    yield outfile
+        else:
+            with open(output_path,'wb') as outfile:
+                yield outfile
+
+    def writer_write_lmf(self,outfile,doc=None):
+        '''
+        write ivar doc pretty printed to outfile
+
+        @type  outfile: file object
+        @param outfile: binary file object
+
+        @type  doc: lxml.etree._ElementTree
+        @param doc: [optional]. document to write (default is ivar doc)
+        '''
+        self.stream_require_tree('writer_write_lmf')
+        if doc is None:
+            doc = self.doc
+
+        doc.write(outfile,
+                       pretty_print=True,
+                       xml_declaration=True,
+                       encoding='utf-8')